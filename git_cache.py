@@ -0,0 +1,471 @@
+"""In-memory cache for the output of read-only git commands."""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import (
+    AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+)
+
+from exceptions import GitCommandError
+from git_runner import run_git, run_git_line_batches
+
+
+# Configuration - adjust for memory budget / freshness needs
+CACHE_MAX_ENTRIES = 256
+# Total size (in characters, ~bytes for git's mostly-ASCII output) each cache
+# may hold; a single output larger than this is not cached at all
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+SESSION_LOG_MAX_BYTES = 64 * 1024 * 1024
+REFS_FRESHNESS_S = 5
+# Relative filters like "7 days ago" drift with wall-clock time, so even an
+# unchanged repository must not be served stale output forever
+ENTRY_TTL_S = 300
+
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class LRUCache(Generic[V]):
+    """
+    Minimal least-recently-used mapping with a fixed number of entries.
+
+    With sizeof, the total size of the values is also kept within max_bytes;
+    a value larger than max_bytes on its own is not stored.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Like get, without counting as a use."""
+        return self._data.get(key)
+
+    def set(self, key: Hashable, value: V) -> None:
+        self.discard(key)
+        size = self._sizeof(value) if self._sizeof else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        self._data[key] = value
+        self._sizes[key] = size
+        self._bytes += size
+        while len(self._data) > self.maxsize or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            self.discard(next(iter(self._data)))
+
+    def discard(self, key: Hashable) -> None:
+        """Remove key if present."""
+        if key in self._data:
+            del self._data[key]
+            self._bytes -= self._sizes.pop(key)
+
+    def discard_where(self, predicate) -> None:
+        """Remove every entry whose key satisfies predicate(key)."""
+        for key in [k for k in self._data if predicate(k)]:
+            self.discard(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# (repo_path, refs_state, args) -> (stored_at, stdout)
+_output_cache: LRUCache[Tuple[float, str]] = LRUCache(
+    CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, lambda entry: len(entry[1])
+)
+# repo_path -> (checked_at, refs_state)
+_refs_states: Dict[str, Tuple[float, str]] = {}
+# Every SessionGitLogCache, so invalidate/clear reach them too
+_session_caches: List["SessionGitLogCache"] = []
+# key -> running fetch shared by concurrent callers. A streaming fetch
+# resolves to None when it could not keep its output for others
+_inflight: Dict[Hashable, "asyncio.Future[Optional[str]]"] = {}
+# Keys of running fetches that a second caller is waiting on
+_joined: Set[Hashable] = set()
+
+
+def _register_flight(key: Hashable, fut: "asyncio.Future[Optional[str]]") -> None:
+    _inflight[key] = fut
+
+    def done(_):
+        _inflight.pop(key, None)
+        _joined.discard(key)
+
+    fut.add_done_callback(done)
+
+
+async def single_flight(key: Hashable, fetch: Callable[[], Awaitable[str]]) -> str:
+    """
+    Run fetch() once for all concurrent callers passing the same key.
+
+    Tools are often invoked in parallel against the same repository; without
+    this every caller that misses the cache spawns its own identical git log.
+    """
+    fut = _inflight.get(key)
+    if fut is None:
+        fut = asyncio.ensure_future(fetch())
+        _register_flight(key, fut)
+    else:
+        _joined.add(key)
+    # A cancelled caller must not cancel the fetch other callers wait on
+    output = await asyncio.shield(fut)
+    if output is None:
+        # The stream we joined could not share its output; fetch it ourselves
+        return await fetch()
+    return output
+
+
+def claim_flight(key: Hashable) -> "Optional[asyncio.Future[Optional[str]]]":
+    """
+    Register a streaming fetch of key, or return None if key is already being fetched.
+
+    The claimer must call finish_flight; callers of single_flight for the
+    same key wait for it instead of starting their own git process.
+    """
+    if key in _inflight:
+        return None
+    fut: "asyncio.Future[Optional[str]]" = asyncio.get_running_loop().create_future()
+    _register_flight(key, fut)
+    return fut
+
+
+def finish_flight(
+    key: Hashable,
+    fut: "asyncio.Future[Optional[str]]",
+    make_output: Optional[Callable[[], Optional[str]]] = None,
+    error: Optional[BaseException] = None
+) -> None:
+    """Resolve a claimed flight; the output is only built if someone is waiting for it."""
+    if fut.done():
+        return
+    if key not in _joined:
+        fut.set_result(None)
+    elif error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(make_output() if make_output else None)
+
+
+async def get_refs_state(repo_path: str) -> str:
+    """
+    Return a fingerprint of HEAD and every ref (name and target) in the repository.
+
+    Tools log with --all, so moving any branch or remote ref (not just HEAD)
+    must invalidate cached output; branch listings also change when a ref is
+    renamed or another branch is checked out, so names and the current
+    branch are part of it. The fingerprint is re-read at most once every
+    REFS_FRESHNESS_S seconds per repository; output cached under the
+    previous fingerprint is dropped when it changes.
+    """
+    now = time.monotonic()
+    checked = _refs_states.get(repo_path)
+    if checked and now - checked[0] < REFS_FRESHNESS_S:
+        return checked[1]
+
+    refs, head = await asyncio.gather(
+        run_git(repo_path, ["for-each-ref", "--format=%(HEAD) %(refname) %(objectname)"]),
+        run_git(repo_path, ["rev-parse", "HEAD"])
+    )
+    state = hashlib.sha1(f"{head}\n{refs}".encode("utf-8")).hexdigest()
+    _refs_states[repo_path] = (now, state)
+
+    if checked and checked[1] != state:
+        # Keyed by the old fingerprint, these entries can no longer match
+        _discard_refs_state(repo_path, checked[1])
+    return state
+
+
+def _discard_refs_state(repo_path: str, refs_state: str) -> None:
+    _output_cache.discard_where(lambda key: key[0] == repo_path and key[1] == refs_state)
+    for session_cache in _session_caches:
+        session_cache.discard_repo(repo_path, refs_state)
+
+
+def _drop_expired_output(now: float) -> None:
+    """Remove output older than ENTRY_TTL_S instead of waiting for the LRU to push it out."""
+    _output_cache.discard_where(lambda key: now - _output_cache.peek(key)[0] >= ENTRY_TTL_S)
+
+
+def get_cached_output(repo_path: str, refs_state: str, args: List[str]) -> Optional[str]:
+    """Return cached stdout for args at refs_state, or None if absent/expired."""
+    hit = _output_cache.get((repo_path, refs_state, tuple(args)))
+    if hit is not None and time.monotonic() - hit[0] < ENTRY_TTL_S:
+        return hit[1]
+    return None
+
+
+def store_output(repo_path: str, refs_state: str, args: List[str], output: str) -> None:
+    """Remember stdout of a read-only git command at refs_state."""
+    now = time.monotonic()
+    _drop_expired_output(now)
+    _output_cache.set((repo_path, refs_state, tuple(args)), (now, output))
+
+
+async def lookup_output(repo_path: str, args: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return (cached stdout or None, refs state to store fresh output under or None)."""
+    try:
+        refs_state = await get_refs_state(repo_path)
+    except GitCommandError:
+        # No HEAD yet (empty repository): nothing worth caching
+        return None, None
+    return get_cached_output(repo_path, refs_state, args), refs_state
+
+
+async def cached_run_git(repo_path: str, args: List[str]) -> str:
+    """
+    run_git for read-only commands, served from cache while refs are unchanged.
+
+    Only use for commands whose output depends solely on repository history
+    (log, branch listing) - never for status, fetch or pull.
+    """
+    output, refs_state = await lookup_output(repo_path, args)
+    if output is None:
+        output = await single_flight((repo_path, tuple(args)), lambda: run_git(repo_path, args))
+        if refs_state is not None:
+            store_output(repo_path, refs_state, args, output)
+    return output
+
+
+async def stream_shared(
+    repo_path: str,
+    args: List[str],
+    process: Callable[[List[str]], T],
+    recorder: "Optional[LogRecorder]" = None,
+    store: Optional[Callable[[Dict[str, str]], None]] = None
+) -> AsyncIterator[T]:
+    """
+    Stream a read-only git command, yielding process(batch) for each batch of lines.
+
+    process runs in a worker thread so parsing never blocks the event loop.
+    The stream is registered with claim_flight: concurrent single_flight
+    callers of the same command wait for it, and if the command is already
+    running this call processes the shared output in one batch instead of
+    spawning git. With a recorder, the output is recorded while it streams
+    and handed to store() once complete.
+    """
+    key = (repo_path, tuple(args))
+    flight = claim_flight(key)
+    if flight is None:
+        output = await single_flight(key, lambda: run_git(repo_path, args))
+        yield await asyncio.to_thread(lambda: process(output.splitlines()))
+        return
+
+    def record_and_process(lines: List[str]) -> T:
+        recorder.feed(lines)
+        return process(lines)
+
+    step = record_and_process if recorder is not None else process
+    records: Optional[Dict[str, str]] = None
+
+    try:
+        async with aclosing(run_git_line_batches(repo_path, args)) as batches:
+            async for lines in batches:
+                yield await asyncio.to_thread(step, lines)
+
+        if recorder is not None:
+            records = recorder.finish()
+            if records is not None and store is not None:
+                store(records)
+    except Exception as exc:
+        finish_flight(key, flight, error=exc)
+        raise
+    finally:
+        # Callers that joined get the recorded output, or run git themselves
+        finish_flight(key, flight, lambda: "\n".join(records.values()) if records is not None else None)
+
+
+class LogRecorder:
+    """
+    Groups git log lines into per-commit records while they stream past.
+
+    Gives up (and drops what it holds) as soon as the output grows beyond
+    max_bytes, so a log too large to cache is never copied.
+    """
+
+    def __init__(self, record_key: Callable[[str], Optional[str]], max_bytes: int):
+        self._record_key = record_key
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._hash: Optional[str] = None
+        self._lines: List[str] = []
+        self.records: Optional[Dict[str, str]] = {}
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Add a run of output lines."""
+        if self.records is None:
+            return
+
+        record_key = self._record_key
+        for line in lines:
+            commit_hash = record_key(line)
+            if commit_hash is not None:
+                self._close_record()
+                self._hash = commit_hash
+            if self._hash is not None:
+                self._lines.append(line)
+                self._size += len(line) + 1
+
+        if self._size > self._max_bytes:
+            self.records = None
+            self._lines = []
+
+    def finish(self) -> Optional[Dict[str, str]]:
+        """Return hash -> record text in log order, or None if the output was too large."""
+        if self.records is not None:
+            self._close_record()
+        return self.records
+
+    def _close_record(self) -> None:
+        if self._hash is not None:
+            self.records[self._hash] = "\n".join(self._lines)
+            self._lines = []
+
+
+def _records_size(records: Dict[str, str]) -> int:
+    return sum(map(len, records.values()))
+
+
+class SessionGitLogCache:
+    """
+    Keeps every git log record seen per (repo, refs state, selection).
+
+    A selection is everything that picks commits other than the time window
+    and count (branch, author filters). Queries for a window of the same
+    selection are a subset of the stored records: repeated queries remember
+    their commit list, others list the wanted commits with a cheap
+    `git log --format=%H` (no diffs), and the matching records are joined instead
+    of re-running git log. Entries are keyed by refs state, so moved refs
+    simply stop matching. Records are the only copy kept: exact repeats are
+    served from them too, not from a second raw string.
+    """
+
+    def __init__(
+        self,
+        record_key: Callable[[str], Optional[str]],
+        maxsize: int = 16,
+        max_bytes: int = SESSION_LOG_MAX_BYTES
+    ):
+        """
+        Args:
+            record_key: Returns the commit hash if a line starts a new record,
+                None for lines belonging to the current record
+            maxsize: Number of selections kept
+            max_bytes: Total size of records kept across all selections
+        """
+        self._record_key = record_key
+        self.max_bytes = max_bytes
+        self._entries: LRUCache[Dict[str, str]] = LRUCache(maxsize, max_bytes, _records_size)
+        # (selection, args) -> (stored_at, commit hashes the query returned)
+        self._windows: LRUCache[Tuple[float, Tuple[str, ...]]] = LRUCache(CACHE_MAX_ENTRIES)
+        _session_caches.append(self)
+
+    def has(self, key: Hashable) -> bool:
+        return self._entries.get(key) is not None
+
+    def recorder(self) -> LogRecorder:
+        """Start collecting streamed output for store_records."""
+        return LogRecorder(self._record_key, self.max_bytes)
+
+    def index(self, raw: str) -> Optional[Dict[str, str]]:
+        """
+        Split raw output into hash -> record text for store_records (None if too large to keep).
+
+        Touches no cache state, so it can run in a worker thread.
+        """
+        if len(raw) > self.max_bytes:
+            return None
+        recorder = self.recorder()
+        recorder.feed(raw.splitlines())
+        return recorder.finish()
+
+    def store_records(self, key: Hashable, args: List[str], records: Optional[Dict[str, str]]) -> None:
+        """Merge hash -> record text for the output of args into the selection."""
+        if records is None:
+            return
+
+        commit_hashes = list(records)
+        existing = self._entries.get(key)
+        if existing:
+            merged = dict(existing)
+            merged.update(records)
+            if _records_size(merged) <= self.max_bytes:
+                records = merged
+        self._entries.set(key, records)
+
+        if self.has(key):
+            self.remember_window(key, args, commit_hashes)
+
+    def remember_window(self, key: Hashable, args: List[str], commit_hashes: List[str]) -> None:
+        """Remember which commits args returned, for exact repeats of the query."""
+        now = time.monotonic()
+        windows = self._windows
+        windows.discard_where(lambda window: now - windows.peek(window)[0] >= ENTRY_TTL_S)
+        windows.set((key, tuple(args)), (now, tuple(commit_hashes)))
+
+    def lookup_window(self, key: Hashable, args: List[str]) -> Optional[str]:
+        """Rebuild output for a query seen within ENTRY_TTL_S, or None."""
+        hit = self._windows.get((key, tuple(args)))
+        if hit is None or time.monotonic() - hit[0] >= ENTRY_TTL_S:
+            return None
+        return self.lookup(key, list(hit[1]))
+
+    def lookup(self, key: Hashable, commit_hashes: List[str]) -> Optional[str]:
+        """Rebuild output for commit_hashes (in order), or None if any is missing."""
+        records = self._entries.get(key)
+        if records is None:
+            return None
+        try:
+            return "\n".join(records[h] for h in commit_hashes)
+        except KeyError:
+            return None
+
+    def discard_repo(self, repo_path: str, refs_state: Optional[str] = None) -> None:
+        """Drop every selection of repo_path, or only those at refs_state (keys start with both)."""
+        def matches(key: Tuple[str, ...]) -> bool:
+            return key[0] == repo_path and (refs_state is None or key[1] == refs_state)
+
+        self._entries.discard_where(matches)
+        self._windows.discard_where(lambda window: matches(window[0]))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._windows.clear()
+
+
+def invalidate(repo_path: str) -> None:
+    """Drop everything cached for repo_path (call after fetch/pull)."""
+    _refs_states.pop(repo_path, None)
+    _output_cache.discard_where(lambda key: key[0] == repo_path)
+    for session_cache in _session_caches:
+        session_cache.discard_repo(repo_path)
+
+
+def clear() -> None:
+    """Drop all cached git output."""
+    _refs_states.clear()
+    _output_cache.clear()
+    for session_cache in _session_caches:
+        session_cache.clear()
@@ -1,11 +1,64 @@
 import asyncio
+import codecs
 import os
 import shutil
-from typing import List
+import subprocess
+import sys
+import time
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, TypeVar
 
 from exceptions import GitNotFoundError, GitRepositoryError, GitCommandError, GitTimeoutError
 
 
+# Parent environment variables git subprocesses inherit. Everything else is
+# dropped so large CI/dev environments aren't copied into every spawn.
+_INHERITED_ENV_VARS = {
+    "PATH", "HOME", "USERPROFILE", "SYSTEMROOT", "TEMP", "TMP", "TMPDIR",
+    "LANG", "LC_ALL", "HOMEDRIVE", "HOMEPATH", "APPDATA", "XDG_CONFIG_HOME",
+    # --since/--until dates like "2025-01-01" or "yesterday" are local time
+    "TZ",
+    "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "ALL_PROXY",
+    "http_proxy", "https_proxy", "no_proxy", "all_proxy",
+    # HTTPS fetch/pull behind custom (e.g. corporate) certificate authorities
+    "SSL_CERT_FILE", "SSL_CERT_DIR",
+    # Linux: git-credential-libsecret reaches the keyring over the session bus
+    "DBUS_SESSION_BUS_ADDRESS", "XDG_RUNTIME_DIR",
+    # Windows: Git Credential Manager and the shell git spawns helpers with
+    # (os.environ upper-cases names there, e.g. ProgramFiles -> PROGRAMFILES)
+    "LOCALAPPDATA", "PROGRAMDATA", "PROGRAMFILES", "COMSPEC",
+}
+# Prefixes for git configuration, ssh remotes (fetch/pull) and locale
+_INHERITED_ENV_PREFIXES = ("GIT_", "SSH_", "LC_")
+
+
+def _build_git_env() -> Dict[str, str]:
+    """Build the environment shared by every git subprocess."""
+    env = {
+        key: value for key, value in os.environ.items()
+        if key in _INHERITED_ENV_VARS or key.startswith(_INHERITED_ENV_PREFIXES)
+    }
+    env.update({"GIT_TERMINAL_PROMPT": "0", "GIT_PAGER": "", "PAGER": ""})
+    return env
+
+
+# Built once at import; every git subprocess shares this environment
+_GIT_ENV = _build_git_env()
+_GIT_PATH: Optional[str] = None
+
+# Seconds a timed-out git process gets to exit after SIGTERM before SIGKILL
+_TERMINATE_GRACE_S = 2
+
+# Bytes read from git's stdout per iteration in run_git_line_batches
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Seconds a repository confirmed by `git rev-parse` is trusted without re-running it
+_REPO_CHECK_TTL_S = 60
+# repo_path -> monotonic time of the last successful rev-parse check
+_verified_repos: Dict[str, float] = {}
+
+T = TypeVar("T")
+
+
 async def ensure_is_git_repo(repo_path: str) -> None:
     """Verify that the given path is a valid git repository."""
     if not repo_path or not isinstance(repo_path, str):
@@ -14,18 +67,137 @@ async def ensure_is_git_repo(repo_path: str) -> None:
     if not os.path.isdir(repo_path):
         raise GitRepositoryError(repo_path)
 
-    await run_git(repo_path, ["rev-parse", "--git-dir"])
+    # Fast path: a .git directory (or gitlink file, for worktrees/submodules)
+    # at the root is enough, no subprocess needed
+    if os.path.exists(os.path.join(repo_path, ".git")):
+        return
+
+    # Subdirectories and bare repositories need git itself to answer
+    checked_at = _verified_repos.get(repo_path)
+    if checked_at is not None and time.monotonic() - checked_at < _REPO_CHECK_TTL_S:
+        return
+
+    # Short-lived probe: a blocking subprocess.run on the default executor is
+    # cheaper than the full asyncio subprocess transport
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, _run_git_sync, repo_path, ["rev-parse", "--git-dir"], 10)
+    _verified_repos[repo_path] = time.monotonic()
+
+
+def install_child_watcher() -> None:
+    """
+    Reap git subprocesses via pidfd on Linux instead of a thread per child.
+
+    Python 3.12+ already does this by default; on older versions the default
+    ThreadedChildWatcher starts one OS thread for every spawned git process.
+    """
+    if sys.platform != "linux" or sys.version_info >= (3, 12):
+        return
+    if not hasattr(asyncio, "PidfdChildWatcher") or not hasattr(os, "pidfd_open"):
+        return
+
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return  # Kernel older than 5.3
+
+    asyncio.set_child_watcher(asyncio.PidfdChildWatcher())
 
 
 def git_exe() -> str:
-    """Find git executable in PATH."""
-    git = shutil.which("git")
-    if not git:
-        raise GitNotFoundError()
-    return git
+    """Find git executable in PATH (cached after the first successful lookup)."""
+    global _GIT_PATH
+    if _GIT_PATH is None:
+        git = shutil.which("git")
+        if not git:
+            raise GitNotFoundError()
+        _GIT_PATH = git
+    return _GIT_PATH
+
+
+def _git_env(extra_env: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Shared git environment, plus extra_env overrides if given."""
+    return {**_GIT_ENV, **extra_env} if extra_env else _GIT_ENV
+
+
+def _run_git_sync(repo_path: str, args: List[str], timeout_s: int = 60) -> str:
+    """Blocking variant of run_git for quick probes run off the event loop."""
+    git = git_exe()
+
+    try:
+        proc = subprocess.run(
+            [git, "--no-pager", *args],
+            cwd=repo_path,
+            env=_GIT_ENV,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            timeout=timeout_s,
+        )
+    except subprocess.TimeoutExpired:
+        raise GitTimeoutError(' '.join(args), timeout_s)
+
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", errors="replace")
+        raise GitCommandError(' '.join(args), err.strip())
+
+    return proc.stdout.decode("utf-8", errors="replace")
+
+
+async def _with_timeout(aw: Awaitable[T], timeout_s: float) -> T:
+    """Await aw, raising asyncio.TimeoutError after timeout_s."""
+    if hasattr(asyncio, "timeout"):
+        # Python 3.11+: a plain context manager, no extra Task per call
+        async with asyncio.timeout(timeout_s):
+            return await aw
+    return await asyncio.wait_for(aw, timeout=timeout_s)
+
+
+async def _spawn_git(
+    repo_path: str,
+    args: List[str],
+    extra_env: Optional[Dict[str, str]] = None
+) -> asyncio.subprocess.Process:
+    """Start a git process with piped stdout/stderr."""
+    return await asyncio.create_subprocess_exec(
+        git_exe(),
+        "--no-pager",
+        *args,
+        cwd=repo_path,
+        env=_git_env(extra_env),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
 
+async def _stop_process(proc: asyncio.subprocess.Process) -> None:
+    """Terminate a git process, escalating to kill if it ignores SIGTERM."""
+    if proc.returncode is not None:
+        return
 
-async def run_git(repo_path: str, args: List[str], timeout_s: int = 60) -> str:
+    try:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), timeout=_TERMINATE_GRACE_S)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+
+
+async def _read_stdout(proc: asyncio.subprocess.Process) -> bytes:
+    """Read all of stdout and wait for the process to exit."""
+    out_b = await proc.stdout.read()
+    await proc.wait()
+    return out_b
+
+
+async def run_git(
+    repo_path: str,
+    args: List[str],
+    timeout_s: int = 60,
+    extra_env: Optional[Dict[str, str]] = None
+) -> str:
     """
     Execute git command and return stdout.
 
@@ -33,6 +205,8 @@ async def run_git(repo_path: str, args: List[str], timeout_s: int = 60) -> str:
         repo_path: Repository directory path
         args: Git command arguments (e.g., ["status", "--short"])
         timeout_s: Command timeout in seconds
+        extra_env: Additional environment variables for this call (most of
+            the parent environment is not inherited, see _INHERITED_ENV_VARS)
 
     Returns:
         Command stdout as string
@@ -40,34 +214,87 @@ async def run_git(repo_path: str, args: List[str], timeout_s: int = 60) -> str:
     Raises:
         RuntimeError: If git not found, command fails, or times out
     """
-    git = git_exe()
+    proc = await _spawn_git(repo_path, args, extra_env)
+    # stderr is almost always empty; drain it in the background rather than
+    # paying for communicate()'s extra reader tasks
+    err_task = asyncio.ensure_future(proc.stderr.read())
 
-    env = os.environ.copy()
-    env["GIT_TERMINAL_PROMPT"] = "0"
-    env["GIT_PAGER"] = ""
-    env["PAGER"] = ""
+    try:
+        out_b = await _with_timeout(_read_stdout(proc), timeout_s)
+        err_b = await err_task
+    except asyncio.TimeoutError:
+        err_task.cancel()
+        await _stop_process(proc)
+        raise GitTimeoutError(' '.join(args), timeout_s)
 
-    proc = await asyncio.create_subprocess_exec(
-        git,
-        "--no-pager",
-        *args,
-        cwd=repo_path,
-        env=env,
-        stdin=asyncio.subprocess.DEVNULL,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
+    if proc.returncode != 0:
+        err = err_b.decode("utf-8", errors="replace")
+        raise GitCommandError(' '.join(args), err.strip())
+
+    return out_b.decode("utf-8", errors="replace")
+
+
+async def run_git_line_batches(
+    repo_path: str,
+    args: List[str],
+    timeout_s: int = 60,
+    extra_env: Optional[Dict[str, str]] = None
+) -> AsyncIterator[List[str]]:
+    """
+    Execute git command and yield its stdout lines as they are produced.
+
+    Unlike run_git, the full output is never held in memory, so parsing
+    overlaps with git still writing. Lines come in batches (one per pipe read)
+    so callers can parse each batch in a plain loop. The git process is only
+    stopped early when the generator is closed: wrap the loop in
+    contextlib.aclosing if it may break out before the end.
+
+    Args:
+        repo_path: Repository directory path
+        args: Git command arguments (e.g., ["log", "--numstat"])
+        timeout_s: Timeout in seconds for the whole command
+        extra_env: Additional environment variables for this call
+
+    Yields:
+        Lists of decoded stdout lines without trailing newline
+
+    Raises:
+        GitCommandError: If git exits non-zero (after all output was yielded)
+        GitTimeoutError: If the command does not finish within timeout_s
+    """
+    proc = await _spawn_git(repo_path, args, extra_env)
+    # Drain stderr alongside stdout so a chatty git can't block on a full pipe
+    err_task = asyncio.ensure_future(proc.stderr.read())
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    deadline = asyncio.get_running_loop().time() + timeout_s
+
+    def remaining() -> float:
+        return deadline - asyncio.get_running_loop().time()
 
     try:
-        out_b, err_b = await asyncio.wait_for(proc.communicate(), timeout=timeout_s)
+        pending = ""
+        while True:
+            chunk = await _with_timeout(proc.stdout.read(_STREAM_CHUNK_SIZE), remaining())
+            text = pending + decoder.decode(chunk, final=not chunk)
+            lines = text.split("\n")
+            pending = lines.pop()
+            if lines:
+                yield lines
+            if not chunk:
+                break
+
+        if pending:
+            yield [pending]
+
+        await _with_timeout(proc.wait(), remaining())
+        err_b = await err_task
     except asyncio.TimeoutError:
-        proc.kill()
         raise GitTimeoutError(' '.join(args), timeout_s)
-
-    out = out_b.decode("utf-8", errors="replace")
-    err = err_b.decode("utf-8", errors="replace")
+    finally:
+        await _stop_process(proc)
+        if not err_task.done():
+            err_task.cancel()
 
     if proc.returncode != 0:
+        err = err_b.decode("utf-8", errors="replace")
         raise GitCommandError(' '.join(args), err.strip())
-
-    return out
@@ -8,6 +8,7 @@ from tools.git_file_changes import register as register_git_file_changes
 from tools.git_sync import register as register_git_sync
 from tools.git_dashboard import register as register_git_dashboard
 from prompts import register_prompts
+from git_runner import install_child_watcher
 
 mcp = FastMCP("git-mcp")
 
@@ -21,4 +22,5 @@ register_git_dashboard(mcp)
 register_prompts(mcp)
 
 if __name__ == "__main__":
+    install_child_watcher()
     mcp.run(transport="stdio")
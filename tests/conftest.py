@@ -1,6 +1,8 @@
 """Shared test fixtures for all tests."""
 import pytest
 import os
+import subprocess
+import time
 
 
 @pytest.fixture
@@ -14,3 +16,35 @@ def test_repo():
         "TEST_REPO_PATH",
         r"C:\Users\Naomi\Desktop\ONNX\onnxruntime"
     )
+
+
+@pytest.fixture
+def mailmap_repo(tmp_path):
+    """
+    Return a throwaway repository whose .mailmap maps "Old Name" to "New Name".
+
+    Commits (newest first): New Name 1 day ago, Old Name 2 days ago,
+    New Name 20 days ago.
+    """
+    repo = str(tmp_path)
+    subprocess.run(["git", "init", "-q", repo], check=True)
+    (tmp_path / ".mailmap").write_text("New Name <new@example.com> Old Name <old@example.com>\n")
+
+    now = int(time.time())
+    commits = [
+        ("New Name", "new@example.com", 20),
+        ("Old Name", "old@example.com", 2),
+        ("New Name", "new@example.com", 1),
+    ]
+    for index, (name, email, days_ago) in enumerate(commits):
+        (tmp_path / f"file{index}.txt").write_text(f"{index}\n")
+        date = f"{now - days_ago * 86400} +0000"
+        env = dict(
+            os.environ,
+            GIT_AUTHOR_NAME=name, GIT_AUTHOR_EMAIL=email, GIT_AUTHOR_DATE=date,
+            GIT_COMMITTER_NAME=name, GIT_COMMITTER_EMAIL=email, GIT_COMMITTER_DATE=date
+        )
+        subprocess.run(["git", "-C", repo, "add", "-A"], check=True, env=env)
+        subprocess.run(["git", "-C", repo, "commit", "-q", "-m", f"commit {index}"], check=True, env=env)
+
+    return repo
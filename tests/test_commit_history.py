@@ -1,10 +1,20 @@
+import asyncio
 import pytest
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tools.git_commit_history import get_commit_history_raw, parse_commit_history, build_commit_history_json
+import git_cache
+from git_runner import run_git, run_git_line_batches
+from tools import git_commit_history
+from tools.git_commit_history import (
+    _commit_history_args,
+    build_commit_history_json,
+    get_commit_history_raw,
+    iter_commits,
+    parse_commit_history
+)
 
 
 @pytest.mark.asyncio
@@ -123,3 +133,97 @@ async def test_build_commit_history_json(test_repo):
     assert summary["total_files_changed"] == expected_files
     assert summary["total_additions"] == expected_additions
     assert summary["total_deletions"] == expected_deletions
+
+
+@pytest.mark.asyncio
+async def test_narrower_window_served_from_widest_log(test_repo, monkeypatch):
+    """Test that a narrower time window is cut from a cached wider log without git log."""
+    git_cache.clear()
+    await get_commit_history_raw(test_repo, since="1 month ago")
+    direct = await run_git(test_repo, _commit_history_args(since="1 week ago", max_count=10))
+
+    calls = []
+
+    async def counting_run_git(repo_path, git_args):
+        calls.append(git_args)
+        return await run_git(repo_path, git_args)
+
+    monkeypatch.setattr(git_commit_history, "run_git", counting_run_git)
+
+    cached = await get_commit_history_raw(test_repo, since="1 week ago", max_count=10)
+    repeated = await get_commit_history_raw(test_repo, since="1 week ago", max_count=10)
+
+    assert parse_commit_history(cached) == parse_commit_history(direct)
+    assert repeated == cached
+    # Only the cheap commit listing runs, and only for the first narrower query
+    assert [git_args[:2] for git_args in calls] == [["log", "--format=%H"]]
+
+
+@pytest.mark.asyncio
+async def test_narrower_window_applies_mailmap_to_author(mailmap_repo):
+    """Test that a window cut from the cached log matches --author on the .mailmap identity."""
+    git_cache.clear()
+    await get_commit_history_raw(mailmap_repo, author="New Name", since="1 month ago")
+
+    cached = await get_commit_history_raw(mailmap_repo, author="New Name", since="1 week ago")
+    direct = await run_git(mailmap_repo, _commit_history_args(author="New Name", since="1 week ago"))
+
+    assert len(parse_commit_history(cached)) == 2
+    assert parse_commit_history(cached) == parse_commit_history(direct)
+
+
+@pytest.mark.asyncio
+async def test_iter_commits_matches_parse(test_repo):
+    """Test that streamed commits equal parsing the buffered output."""
+    git_cache.clear()
+    streamed = [commit async for commit in iter_commits(test_repo, max_count=10)]
+    # Served from the records the stream left in the cache
+    raw_output = await get_commit_history_raw(test_repo, max_count=10)
+    direct = await run_git(test_repo, _commit_history_args(max_count=10))
+
+    assert streamed == parse_commit_history(raw_output) == parse_commit_history(direct)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stream_and_fetch_share_one_git_log(test_repo, monkeypatch):
+    """Test that a streaming and a buffered caller of the same log spawn git log once."""
+    spawned = []
+
+    async def counting_run_git(repo_path, git_args):
+        spawned.append(git_args[0])
+        return await run_git(repo_path, git_args)
+
+    def counting_batches(repo_path, git_args):
+        spawned.append(git_args[0])
+        return run_git_line_batches(repo_path, git_args)
+
+    monkeypatch.setattr(git_commit_history, "run_git", counting_run_git)
+    monkeypatch.setattr(git_cache, "run_git", counting_run_git)
+    monkeypatch.setattr(git_cache, "run_git_line_batches", counting_batches)
+
+    async def streamed():
+        return [commit async for commit in iter_commits(test_repo, max_count=10)]
+
+    async def buffered():
+        return parse_commit_history(await get_commit_history_raw(test_repo, max_count=10))
+
+    for first, second in ((streamed, buffered), (buffered, streamed)):
+        git_cache.clear()
+        spawned.clear()
+
+        results = await asyncio.gather(first(), second())
+
+        assert results[0] == results[1]
+        assert spawned.count("log") == 1
+
+
+@pytest.mark.asyncio
+async def test_paths_filter_limits_files(test_repo):
+    """Test that a pathspec filter only returns changes under that path."""
+    raw = await get_commit_history_raw(test_repo, max_count=10, paths=["docs"])
+    commits = parse_commit_history(raw)
+
+    for commit in commits:
+        assert commit["files"]
+        for file_info in commit["files"]:
+            assert file_info["path"].startswith("docs")
@@ -4,8 +4,10 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tools.git_compare_developers import compare_developers, build_comparison_json
+import git_cache
+from tools.git_compare_developers import compare_developers, build_comparison_json, bucket_commits_by_author
 from tools.git_commit_history import get_commit_history_raw, parse_commit_history
+from tools.git_developer_stats import analyze_developer_stats
 
 
 def test_compare_developers_function():
@@ -187,3 +189,69 @@ async def test_compare_two_specific_developers(test_repo):
     assert "comparison" in result
     assert "rankings" in result["comparison"]
     assert "totals" in result["comparison"]
+
+
+def test_bucket_commits_by_author():
+    """Test that commits are split per author the way git --author matches."""
+    commits = [
+        {"author_name": "Erik Smith", "author_email": "erik@example.com"},
+        {"author_name": "John Doe", "author_email": "john@example.com"},
+        {"author_name": "Erik Jones", "author_email": "ejones@example.com"},
+        {"author_name": "c++dev", "author_email": "cpp@example.com"}
+    ]
+
+    buckets = bucket_commits_by_author(commits, ["Erik", "john@example.com", "c++", "Nobody"])
+
+    assert [c["author_name"] for c in buckets["Erik"]] == ["Erik Smith", "Erik Jones"]
+    assert [c["author_name"] for c in buckets["john@example.com"]] == ["John Doe"]
+    assert [c["author_name"] for c in buckets["c++"]] == ["c++dev"]
+    assert buckets["Nobody"] == []
+
+    # .mailmap: git returns "Old Name" commits for --author="New Name"
+    raw = "\n".join([
+        "COMMIT|bbb|New Name|new@example.com|2025-01-02 10:00:00 +0000|second",
+        "MAILMAP|New Name|new@example.com",
+        "",
+        "1\t0\tb.txt",
+        "",
+        "COMMIT|aaa|Old Name|old@example.com|2025-01-01 10:00:00 +0000|first",
+        "MAILMAP|New Name|new@example.com",
+        "",
+        "1\t0\ta.txt"
+    ])
+    mapped_commits = parse_commit_history(raw)
+
+    buckets = bucket_commits_by_author(mapped_commits, ["New Name", "Old Name"])
+
+    assert [c["hash"] for c in buckets["New Name"]] == ["bbb", "aaa"]
+    assert [c["hash"] for c in buckets["Old Name"]] == ["aaa"]
+    assert mapped_commits[1]["files"] == [{"path": "a.txt", "additions": 1, "deletions": 0}]
+
+
+@pytest.mark.asyncio
+async def test_build_comparison_json_matches_per_author_log(test_repo):
+    """Test that the single batched log gives the same stats as one log per author."""
+    raw_all = await get_commit_history_raw(test_repo, max_count=100, since="1 month ago")
+    authors = sorted({c["author_name"] for c in parse_commit_history(raw_all)})[:3]
+
+    if len(authors) < 2:
+        pytest.skip("Need at least 2 developers for comparison")
+
+    result = await build_comparison_json(test_repo, authors, since="1 month ago")
+
+    for dev_stat in result["developers"]:
+        raw = await get_commit_history_raw(test_repo, author=dev_stat["developer"], since="1 month ago")
+        expected = analyze_developer_stats(parse_commit_history(raw))
+        expected["activity_score"] = expected["total_additions"] + expected["total_deletions"]
+        assert dev_stat["stats"] == expected
+
+
+@pytest.mark.asyncio
+async def test_comparison_narrower_window_counts_mailmapped_commits(mailmap_repo):
+    """Test that a second comparison over a narrower window still counts .mailmap aliases."""
+    git_cache.clear()
+    wide = await build_comparison_json(mailmap_repo, ["New Name"], since="1 month ago")
+    narrow = await build_comparison_json(mailmap_repo, ["New Name"], since="1 week ago")
+
+    assert wide["developers"][0]["stats"]["total_commits"] == 3
+    assert narrow["developers"][0]["stats"]["total_commits"] == 2
@@ -4,7 +4,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tools.git_file_changes import get_file_history_raw, parse_file_history, build_file_history_json
+from tools.git_file_changes import get_file_history_raw, parse_file_history, build_file_history_json, iter_file_history
 
 TEST_FILE = "README.md"
 
@@ -139,3 +139,12 @@ async def test_specific_file(test_repo):
             assert isinstance(total_deletions, int)
 
         break
+
+
+@pytest.mark.asyncio
+async def test_iter_file_history_matches_parse(test_repo):
+    """Test that streamed file history equals parsing the buffered output."""
+    streamed = [commit async for commit in iter_file_history(test_repo, "README.md", max_count=10)]
+    raw_output = await get_file_history_raw(test_repo, "README.md", max_count=10)
+
+    assert streamed == parse_file_history(raw_output, "README.md")
@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import git_cache
+from git_cache import LRUCache, LogRecorder, cached_run_git, get_refs_state
+from git_runner import run_git
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache."""
+    git_cache.clear()
+    yield
+    git_cache.clear()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test that LRUCache drops the oldest untouched entry when full."""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_keeps_within_byte_budget():
+    """Test that LRUCache evicts by total size and never stores oversized values."""
+    cache = LRUCache(maxsize=10, max_bytes=5, sizeof=len)
+    cache.set("a", "abc")
+    cache.set("b", "de")
+    cache.set("c", "fg")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "de"
+    assert cache.get("c") == "fg"
+
+    cache.set("big", "too large")
+
+    assert cache.get("big") is None
+    assert len(cache) == 2
+
+
+def test_log_recorder_groups_records_and_gives_up_when_too_large():
+    """Test that LogRecorder splits records by header and drops output over its budget."""
+    def record_key(line):
+        return line[2:] if line.startswith("C ") else None
+
+    recorder = LogRecorder(record_key, max_bytes=100)
+    recorder.feed(["C a", "1", ""])
+    recorder.feed(["C b", "2"])
+
+    assert recorder.finish() == {"a": "C a\n1\n", "b": "C b\n2"}
+
+    small = LogRecorder(record_key, max_bytes=5)
+    small.feed(["C a", "12345"])
+
+    assert small.finish() is None
+
+
+@pytest.mark.asyncio
+async def test_cached_run_git_matches_run_git(test_repo):
+    """Test that cached output is identical to running git directly."""
+    args = ["log", "--oneline", "-5"]
+
+    expected = await run_git(test_repo, args)
+
+    assert await cached_run_git(test_repo, args) == expected
+    assert await cached_run_git(test_repo, args) == expected
+
+
+@pytest.mark.asyncio
+async def test_cached_run_git_skips_git_on_hit(test_repo, monkeypatch):
+    """Test that a repeated call is served without spawning git for the command."""
+    args = ["log", "--oneline", "-5"]
+    await get_refs_state(test_repo)
+    first = await cached_run_git(test_repo, args)
+
+    calls = []
+
+    async def counting_run_git(repo_path, git_args):
+        calls.append(git_args)
+        return await run_git(repo_path, git_args)
+
+    monkeypatch.setattr(git_cache, "run_git", counting_run_git)
+
+    assert await cached_run_git(test_repo, args) == first
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_refetch(test_repo, monkeypatch):
+    """Test that invalidate drops cached output for the repository."""
+    args = ["log", "--oneline", "-5"]
+    await cached_run_git(test_repo, args)
+
+    git_cache.invalidate(test_repo)
+
+    calls = []
+
+    async def counting_run_git(repo_path, git_args):
+        calls.append(git_args)
+        return await run_git(repo_path, git_args)
+
+    monkeypatch.setattr(git_cache, "run_git", counting_run_git)
+
+    await cached_run_git(test_repo, args)
+    assert args in calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_git_call(test_repo, monkeypatch):
+    """Test that parallel identical requests spawn the command only once."""
+    args = ["log", "--oneline", "-5"]
+    await get_refs_state(test_repo)
+
+    calls = []
+
+    async def counting_run_git(repo_path, git_args):
+        calls.append(git_args)
+        return await run_git(repo_path, git_args)
+
+    monkeypatch.setattr(git_cache, "run_git", counting_run_git)
+
+    results = await asyncio.gather(*(cached_run_git(test_repo, args) for _ in range(3)))
+
+    assert len(set(results)) == 1
+    assert calls == [args]
+
+
+@pytest.mark.asyncio
+async def test_refs_state_changes_on_branch_rename(tmp_path, monkeypatch):
+    """Test that renaming a branch (same commit) changes the refs fingerprint."""
+    repo = str(tmp_path)
+    env = {
+        "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+        "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com"
+    }
+    await run_git(repo, ["init", "-q"])
+    await run_git(repo, ["commit", "-q", "--allow-empty", "-m", "init"], extra_env=env)
+    await run_git(repo, ["branch", "alpha"])
+
+    before = await get_refs_state(repo)
+    await run_git(repo, ["branch", "-m", "alpha", "beta"])
+    monkeypatch.setattr(git_cache, "REFS_FRESHNESS_S", 0)
+
+    assert await get_refs_state(repo) != before
+
+
+def test_expired_output_is_dropped_on_store(monkeypatch):
+    """Test that storing output evicts entries past ENTRY_TTL_S."""
+    git_cache.store_output("/repo", "state", ["log"], "old")
+    monkeypatch.setattr(git_cache, "ENTRY_TTL_S", 0)
+
+    git_cache.store_output("/repo", "state", ["branch"], "new")
+
+    assert git_cache._output_cache.peek(("/repo", "state", ("log",))) is None
@@ -67,6 +67,33 @@ remote: Compressing objects: 100% (50/50), done.
         assert "action" in branch_info
 
 
+def test_parse_fetch_output_ref_updates():
+    """Test new, forced, fast-forward, up-to-date and pruned ref lines."""
+    sample_output = """Fetching origin
+From github.com:example/repo
+ * [new branch]      feature    -> origin/feature
+ + 1a2b3c4...5d6e7f8 rebased    -> origin/rebased  (forced update)
+   1111111..2222222  main       -> origin/main
+   3333333..4444444  fix        -> origin/fix
+ = [up to date]      stable     -> origin/stable
+ - [deleted]         (none)     -> origin/gone
+ x [deleted]         (none)     -> origin/old
+"""
+
+    result = parse_fetch_output(sample_output)
+
+    assert result["remotes_synced"] == ["origin"]
+    assert result["branches_updated"] == [
+        {"remote": "origin", "branch": "feature", "action": "new"},
+        {"remote": "origin", "branch": "rebased", "action": "updated"},
+        {"remote": "origin", "branch": "main", "action": "updated"},
+        {"remote": "origin", "branch": "fix", "action": "updated"},
+        {"remote": "origin", "branch": "stable", "action": "updated"}
+    ]
+    # " - " is current git's prune marker, " x " the one older versions print
+    assert result["branches_pruned"] == ["gone", "old"]
+
+
 def test_parse_status_output():
     """Test that parse_status_output correctly parses git status output."""
     status_up_to_date = "## main...origin/main"
@@ -100,6 +127,27 @@ def test_parse_status_output():
     assert result4["behind"] == 1
     assert result4["sync_status"] == "diverged"
 
+    # Fresh clone of an empty repository
+    status_no_commits = "## No commits yet on master...origin/master [gone]"
+    result5 = parse_status_output(status_no_commits)
+
+    assert result5["current_branch"] == "No commits yet on master"
+    assert result5["tracking"] == "origin/master"
+    assert result5["sync_status"] == "up-to-date"
+
+    status_wide = "## main...origin/main  [ahead 1]"
+    result6 = parse_status_output(status_wide)
+
+    assert result6["tracking"] == "origin/main"
+    assert result6["ahead"] == 1
+    assert result6["sync_status"] == "ahead"
+
+    status_detached = "## HEAD (no branch)"
+    result7 = parse_status_output(status_detached)
+
+    assert result7["current_branch"] == "HEAD"
+    assert result7["tracking"] is None
+
 
 @pytest.mark.asyncio
 async def test_build_sync_json(test_repo):
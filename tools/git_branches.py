@@ -1,7 +1,8 @@
 from typing import Any, Dict, List
 
 from mcp.server.fastmcp import FastMCP
-from git_runner import run_git, ensure_is_git_repo
+from git_runner import ensure_is_git_repo
+from git_cache import cached_run_git
 
 
 async def get_branches_raw(repo_path: str) -> str:
@@ -12,7 +13,7 @@ async def get_branches_raw(repo_path: str) -> str:
         "--format=%(refname:short)|%(committerdate:iso8601)",
         "--sort=-committerdate"
     ]
-    return await run_git(repo_path, args)
+    return await cached_run_git(repo_path, args)
 
 
 def parse_branches(raw: str) -> List[Dict[str, Any]]:
@@ -20,17 +21,14 @@ def parse_branches(raw: str) -> List[Dict[str, Any]]:
     branches = []
 
     for line in raw.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-
-        parts = line.split("|", 1)
-        if len(parts) != 2 or not parts[0].strip():
+        name, sep, date = line.partition("|")
+        name = name.strip()
+        if not sep or not name:
             continue
 
         branches.append({
-            "name": parts[0].strip(),
-            "last_commit_date": parts[1].strip()
+            "name": name,
+            "last_commit_date": date.strip()
         })
 
     return branches
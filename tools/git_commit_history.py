@@ -1,21 +1,29 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 from mcp.server.fastmcp import FastMCP
+from exceptions import GitCommandError
 from git_runner import run_git, ensure_is_git_repo
+from git_cache import SessionGitLogCache, get_refs_state, single_flight, stream_shared
 
 
-async def get_commit_history_raw(
-    repo_path: str,
+COMMIT_FORMAT = "--pretty=format:COMMIT|%H|%an|%ae|%ai|%s"
+# Same, plus the .mailmap-mapped identity that git's --author matches against
+MAILMAP_COMMIT_FORMAT = COMMIT_FORMAT + "%nMAILMAP|%aN|%aE"
+
+
+def _revision_args(
     branch: Optional[str] = None,
     max_count: Optional[int] = None,
     since: Optional[str] = None,
     until: Optional[str] = None,
-    author: Optional[str] = None
-) -> str:
-    """Execute git log with filters and return raw output."""
-    args = ["log", "--numstat", "--pretty=format:COMMIT|%H|%an|%ae|%ai|%s"]
-
-    args.append(branch if branch else "--all")
+    author: Optional[str] = None,
+    authors: Optional[List[str]] = None,
+    paths: Optional[List[str]] = None
+) -> List[str]:
+    """Build commit-selection arguments shared by the full log and the hash listing."""
+    args = [branch if branch else "--all"]
 
     if max_count:
         args.append(f"-{max_count}")
@@ -25,84 +33,291 @@ async def get_commit_history_raw(
         args.append(f"--until={until}")
     if author:
         args.append(f"--author={author}")
+    # git ORs repeated --author flags
+    for name in authors or []:
+        args.append(f"--author={name}")
+    # Pathspecs go last; git skips commits that touch none of them
+    if paths:
+        args.append("--")
+        args.extend(paths)
 
-    return await run_git(repo_path, args)
+    return args
 
 
-def parse_commit_history(raw: str) -> List[Dict[str, Any]]:
-    """Parse git log output into structured commit list."""
-    commits = []
-    if not raw:
-        return commits
+def _commit_history_args(
+    branch: Optional[str] = None,
+    max_count: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    author: Optional[str] = None,
+    authors: Optional[List[str]] = None,
+    paths: Optional[List[str]] = None,
+    mailmap: bool = False
+) -> List[str]:
+    """Build git log arguments for the given filters."""
+    pretty = MAILMAP_COMMIT_FORMAT if mailmap else COMMIT_FORMAT
+    return ["log", "--numstat", pretty] + _revision_args(
+        branch, max_count, since, until, author, authors, paths
+    )
 
-    current_commit = None
 
-    for line in raw.splitlines():
-        line = line.strip()
+def commit_record_key(line: str) -> Optional[str]:
+    """Return the commit hash if line is a COMMIT| header."""
+    if line.startswith("COMMIT|"):
+        return line.split("|", 2)[1]
+    return None
+
+
+# Widest log seen per branch/author selection; narrower time windows of the
+# same selection are cut from it instead of walking history with --numstat
+_session_log_cache = SessionGitLogCache(commit_record_key)
+
+# (selection, log args) - where fetched output is stored
+_CacheSlot = Tuple[Tuple[str, ...], List[str]]
+
+
+async def _lookup_history(
+    repo_path: str,
+    branch: Optional[str],
+    max_count: Optional[int],
+    since: Optional[str],
+    until: Optional[str],
+    author: Optional[str],
+    authors: Optional[List[str]],
+    paths: Optional[List[str]],
+    mailmap: bool = False
+) -> Tuple[Optional[str], Optional[_CacheSlot]]:
+    """Return (cached raw log or None, slot to store a fresh result in or None)."""
+    args = _commit_history_args(branch, max_count, since, until, author, authors, paths, mailmap)
+
+    try:
+        refs_state = await get_refs_state(repo_path)
+    except GitCommandError:
+        # No HEAD yet (empty repository): nothing worth caching
+        return None, None
+
+    # The pretty format is part of the selection: records differ between formats
+    selection = (
+        repo_path, refs_state, args[2],
+        *_revision_args(branch, author=author, authors=authors, paths=paths)
+    )
+    slot = (selection, args)
+
+    raw = _session_log_cache.lookup_window(selection, args)
+    if raw is None and _session_log_cache.has(selection):
+        revisions = _revision_args(branch, max_count, since, until, author, authors, paths)
+        # git log, not rev-list: only log applies .mailmap to --author
+        commit_hashes = (await run_git(repo_path, ["log", "--format=%H", *revisions])).split()
+        raw = _session_log_cache.lookup(selection, commit_hashes)
+        if raw is not None:
+            _session_log_cache.remember_window(selection, args, commit_hashes)
+
+    return raw, slot
+
+
+async def _store_history(slot: Optional[_CacheSlot], raw: str) -> None:
+    """Cache a freshly fetched log for exact and narrower-window reuse."""
+    if slot is None:
+        return
+    selection, args = slot
+    # Splitting a multi-MB log happens off the event loop; only the merge touches the cache
+    records = await asyncio.to_thread(_session_log_cache.index, raw)
+    _session_log_cache.store_records(selection, args, records)
+
+
+async def get_commit_history_raw(
+    repo_path: str,
+    branch: Optional[str] = None,
+    max_count: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    author: Optional[str] = None,
+    authors: Optional[List[str]] = None,
+    paths: Optional[List[str]] = None,
+    mailmap: bool = False
+) -> str:
+    """Execute git log with filters and return raw output (mailmap adds MAILMAP| lines)."""
+    raw, slot = await _lookup_history(
+        repo_path, branch, max_count, since, until, author, authors, paths, mailmap
+    )
+    if raw is not None:
+        return raw
+
+    args = _commit_history_args(branch, max_count, since, until, author, authors, paths, mailmap)
+    raw = await single_flight((repo_path, tuple(args)), lambda: run_git(repo_path, args))
+    await _store_history(slot, raw)
+    return raw
+
+
+def format_authors(identities: Iterable[Tuple[str, str]]) -> List[str]:
+    """
+    Return the sorted distinct "name <email>" strings for (name, email) pairs.
+
+    Identities repeat heavily across commits, so pairs are deduplicated
+    first and each distinct one is formatted only once.
+    """
+    return sorted({f"{name} <{email}>" for name, email in set(identities)})
+
+
+def count_paths(paths: Iterable[str]) -> Counter:
+    """
+    Count how often each path occurs, keeping first-seen order.
+
+    Callers collect the paths during their own pass over commit["files"];
+    Counter then tallies them in C instead of a per-file Python increment.
+    """
+    return Counter(paths)
+
+
+def _start_commit(line: str, pool: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Create a commit dict from a COMMIT| header line (None if malformed)."""
+    parts = line[7:].split("|", 4)
+    if len(parts) != 5:
+        return None
+
+    # %H and %ai are fixed-format; only the free-text fields need trimming
+    commit_hash, author_name, author_email, date, message = parts
+    author_name = author_name.strip()
+    author_email = author_email.strip()
+
+    return {
+        "hash": commit_hash,
+        "author_name": pool.setdefault(author_name, author_name),
+        "author_email": pool.setdefault(author_email, author_email),
+        "date": date,
+        "message": message.strip(),
+        "files": [],
+        "stats": {
+            "total_files": 0,
+            "total_additions": 0,
+            "total_deletions": 0
+        }
+    }
+
+
+def _add_file_change(commit: Dict[str, Any], line: str, pool: Dict[str, str]) -> None:
+    """Append a numstat line (additions\tdeletions\tpath) and update running totals (or record a MAILMAP| line)."""
+    parts = line.split("\t")
+    if len(parts) == 3:
+        additions_str, deletions_str, filepath = parts
+        additions = 0 if additions_str == "-" else int(additions_str)
+        deletions = 0 if deletions_str == "-" else int(deletions_str)
+
+        commit["files"].append({
+            "path": pool.setdefault(filepath, filepath),
+            "additions": additions,
+            "deletions": deletions
+        })
+
+        stats = commit["stats"]
+        stats["total_files"] += 1
+        stats["total_additions"] += additions
+        stats["total_deletions"] += deletions
 
+    elif line.startswith("MAILMAP|"):
+        mapped = line[8:].split("|", 1)
+        if len(mapped) == 2:
+            commit["mapped_author_name"] = pool.setdefault(mapped[0], mapped[0])
+            commit["mapped_author_email"] = pool.setdefault(mapped[1], mapped[1])
+
+
+def _parse_commit_lines(
+    lines: Iterable[str],
+    current_commit: Optional[Dict[str, Any]],
+    pool: Dict[str, str],
+    completed: List[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Parse a run of git log lines, appending every commit a later header closes to completed.
+
+    Returns the commit still open after the last line; pass it back in with
+    the next run of lines, or append it once the log has ended.
+    """
+    # git log lines carry no padding, so they are used without strip()
+    for line in lines:
         if line.startswith("COMMIT|"):
             if current_commit:
-                total_additions = sum(f["additions"] for f in current_commit["files"])
-                total_deletions = sum(f["deletions"] for f in current_commit["files"])
-                current_commit["stats"] = {
-                    "total_files": len(current_commit["files"]),
-                    "total_additions": total_additions,
-                    "total_deletions": total_deletions
-                }
-                commits.append(current_commit)
-
-            parts = line.split("|", 5)
-            if len(parts) != 6:
-                current_commit = None
-                continue
-
-            current_commit = {
-                "hash": parts[1].strip(),
-                "author_name": parts[2].strip(),
-                "author_email": parts[3].strip(),
-                "date": parts[4].strip(),
-                "message": parts[5].strip(),
-                "files": []
-            }
+                completed.append(current_commit)
+            current_commit = _start_commit(line, pool)
 
         elif current_commit and line:
-            parts = line.split("\t")
-            if len(parts) == 3:
-                additions_str, deletions_str, filepath = parts
-                additions = 0 if additions_str.strip() == "-" else int(additions_str)
-                deletions = 0 if deletions_str.strip() == "-" else int(deletions_str)
-
-                current_commit["files"].append({
-                    "path": filepath.strip(),
-                    "additions": additions,
-                    "deletions": deletions
-                })
+            _add_file_change(current_commit, line, pool)
 
-    if current_commit:
-        total_additions = sum(f["additions"] for f in current_commit["files"])
-        total_deletions = sum(f["deletions"] for f in current_commit["files"])
-        current_commit["stats"] = {
-            "total_files": len(current_commit["files"]),
-            "total_additions": total_additions,
-            "total_deletions": total_deletions
-        }
-        commits.append(current_commit)
+    return current_commit
+
+
+def parse_commit_history(raw: str) -> List[Dict[str, Any]]:
+    """Parse git log output into structured commit list."""
+    commits: List[Dict[str, Any]] = []
+    if not raw:
+        return commits
+
+    # One shared string per distinct author/path instead of one per occurrence
+    pool: Dict[str, str] = {}
+
+    last_commit = _parse_commit_lines(raw.splitlines(), None, pool, commits)
+    if last_commit:
+        commits.append(last_commit)
 
     return commits
 
 
-def build_commit_history_json(
+async def iter_commits(
     repo_path: str,
-    commits_raw: str,
     branch: Optional[str] = None,
     max_count: Optional[int] = None,
     since: Optional[str] = None,
     until: Optional[str] = None,
-    author: Optional[str] = None
-) -> Dict[str, Any]:
-    """Build final JSON response for commit history."""
-    commits = parse_commit_history(commits_raw)
+    author: Optional[str] = None,
+    authors: Optional[List[str]] = None,
+    paths: Optional[List[str]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream git log and yield parsed commits as soon as each one is complete.
+
+    Same result as parse_commit_history(await get_commit_history_raw(...)),
+    without waiting for the whole log first. Served from the history cache
+    when possible.
+    """
+    raw, slot = await _lookup_history(
+        repo_path, branch, max_count, since, until, author, authors, paths
+    )
+    if raw is not None:
+        # A cached log arrives all at once: parse it off the event loop
+        for commit in await asyncio.to_thread(parse_commit_history, raw):
+            yield commit
+        return
+
+    args = _commit_history_args(branch, max_count, since, until, author, authors, paths)
+    current_commit = None
+    pool: Dict[str, str] = {}
+
+    def parse_batch(lines: List[str]) -> List[Dict[str, Any]]:
+        nonlocal current_commit
+        completed: List[Dict[str, Any]] = []
+        current_commit = _parse_commit_lines(lines, current_commit, pool, completed)
+        return completed
+
+    # Tee the stream into per-commit records so later calls can reuse it
+    recorder = _session_log_cache.recorder() if slot is not None else None
+
+    def store(records: Dict[str, str]) -> None:
+        _session_log_cache.store_records(slot[0], args, records)
+
+    async for completed in stream_shared(repo_path, args, parse_batch, recorder, store):
+        for commit in completed:
+            yield commit
+
+    if current_commit:
+        yield current_commit
+
 
+def _commit_history_json(
+    repo_path: str,
+    commits: List[Dict[str, Any]],
+    filters: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build the commit history response from already parsed commits."""
     summary = {
         "total_commits": len(commits),
         "total_files_changed": 0,
@@ -113,28 +328,55 @@ def build_commit_history_json(
     }
 
     if commits:
-        summary["total_files_changed"] = sum(c["stats"]["total_files"] for c in commits)
-        summary["total_additions"] = sum(c["stats"]["total_additions"] for c in commits)
-        summary["total_deletions"] = sum(c["stats"]["total_deletions"] for c in commits)
+        total_files = 0
+        total_additions = 0
+        total_deletions = 0
+        authors_set = set()
 
-        authors_set = {f"{c['author_name']} <{c['author_email']}>" for c in commits}
-        summary["authors"] = sorted(authors_set)
+        for c in commits:
+            stats = c["stats"]
+            total_files += stats["total_files"]
+            total_additions += stats["total_additions"]
+            total_deletions += stats["total_deletions"]
+            authors_set.add((c["author_name"], c["author_email"]))
+
+        summary["total_files_changed"] = total_files
+        summary["total_additions"] = total_additions
+        summary["total_deletions"] = total_deletions
+        summary["authors"] = format_authors(authors_set)
 
         summary["date_range"]["latest"] = commits[0]["date"]
         summary["date_range"]["earliest"] = commits[-1]["date"]
 
     return {
         "repo": {"path": repo_path},
-        "filters": {
+        "filters": filters,
+        "commits": commits,
+        "summary": summary
+    }
+
+
+def build_commit_history_json(
+    repo_path: str,
+    commits_raw: str,
+    branch: Optional[str] = None,
+    max_count: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    author: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build final JSON response for commit history."""
+    return _commit_history_json(
+        repo_path,
+        parse_commit_history(commits_raw),
+        {
             "branch": branch,
             "max_count": max_count,
             "since": since,
             "until": until,
             "author": author
-        },
-        "commits": commits,
-        "summary": summary
-    }
+        }
+    )
 
 
 def register(mcp: FastMCP) -> None:
@@ -164,21 +406,25 @@ def register(mcp: FastMCP) -> None:
         """
         await ensure_is_git_repo(repo_path)
 
-        raw = await get_commit_history_raw(
-            repo_path=repo_path,
-            branch=branch,
-            max_count=max_count,
-            since=since,
-            until=until,
-            author=author
-        )
+        commits = [
+            commit async for commit in iter_commits(
+                repo_path=repo_path,
+                branch=branch,
+                max_count=max_count,
+                since=since,
+                until=until,
+                author=author
+            )
+        ]
 
-        return build_commit_history_json(
+        return _commit_history_json(
             repo_path=repo_path,
-            commits_raw=raw,
-            branch=branch,
-            max_count=max_count,
-            since=since,
-            until=until,
-            author=author
+            commits=commits,
+            filters={
+                "branch": branch,
+                "max_count": max_count,
+                "since": since,
+                "until": until,
+                "author": author
+            }
         )
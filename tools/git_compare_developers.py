@@ -1,3 +1,5 @@
+import asyncio
+import re
 from typing import Any, Dict, List, Optional
 
 from mcp.server.fastmcp import FastMCP
@@ -6,6 +8,69 @@ from tools.git_developer_stats import analyze_developer_stats
 from git_runner import ensure_is_git_repo
 
 
+# Characters that are literal in git's basic regex (BRE) but special in Python
+_BRE_LITERALS = set("+?|(){}")
+
+
+def _author_pattern(author: str) -> "re.Pattern[str]":
+    """Translate a git --author pattern (POSIX basic regex) into a Python regex."""
+    out = []
+    i = 0
+    while i < len(author):
+        ch = author[i]
+        if ch == "\\" and i + 1 < len(author):
+            nxt = author[i + 1]
+            # In BRE "\+", "\(" etc. are the operators; in Python they are bare
+            out.append(nxt if nxt in _BRE_LITERALS else ch + nxt)
+            i += 2
+            continue
+        out.append("\\" + ch if ch in _BRE_LITERALS else ch)
+        i += 1
+
+    try:
+        return re.compile("".join(out))
+    except re.error:
+        return re.compile(re.escape(author))
+
+
+def bucket_commits_by_author(
+    commits: List[Dict[str, Any]],
+    authors: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split commits by which requested author they match.
+
+    Matching mirrors git's --author: the pattern is searched in "Name <email>",
+    case-sensitively. Git matches the .mailmap-mapped identity (older versions
+    the raw one), so commits parsed from a mailmap log are matched on both.
+    A commit matching several authors is counted for each.
+    """
+    buckets: Dict[str, List[Dict[str, Any]]] = {author: [] for author in authors}
+    patterns = [(author, _author_pattern(author)) for author in buckets]
+    # Far fewer identities than commits: match each identity only once
+    matches: Dict[tuple, List[List[Dict[str, Any]]]] = {}
+
+    for commit in commits:
+        key = (
+            commit["author_name"], commit["author_email"],
+            commit.get("mapped_author_name"), commit.get("mapped_author_email")
+        )
+        targets = matches.get(key)
+        if targets is None:
+            idents = [f"{key[0]} <{key[1]}>"]
+            if key[2] is not None:
+                idents.append(f"{key[2]} <{key[3]}>")
+            targets = [
+                buckets[author] for author, pattern in patterns
+                if any(pattern.search(ident) for ident in idents)
+            ]
+            matches[key] = targets
+        for bucket in targets:
+            bucket.append(commit)
+
+    return buckets
+
+
 def compare_developers(developer_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Compare statistics between multiple developers."""
     if not developer_stats:
@@ -25,46 +90,40 @@ def compare_developers(developer_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
             }
         }
 
+    # ranking name -> stats field it is ranked by
+    ranked_fields = {
+        "most_commits": "total_commits",
+        "most_files_changed": "total_files_changed",
+        "most_additions": "total_additions",
+        "most_deletions": "total_deletions",
+        "most_active": "activity_score"
+    }
+    best: Dict[str, Dict[str, Any]] = {}
+    totals = {
+        "total_commits": 0,
+        "total_files_changed": 0,
+        "total_additions": 0,
+        "total_deletions": 0
+    }
+
+    # Single pass: activity score, all five maxima and the totals together
     for dev_stat in developer_stats:
         stats = dev_stat["stats"]
         stats["activity_score"] = stats["total_additions"] + stats["total_deletions"]
 
-    most_commits = max(developer_stats, key=lambda x: x["stats"]["total_commits"])
-    most_files = max(developer_stats, key=lambda x: x["stats"]["total_files_changed"])
-    most_additions = max(developer_stats, key=lambda x: x["stats"]["total_additions"])
-    most_deletions = max(developer_stats, key=lambda x: x["stats"]["total_deletions"])
-    most_active = max(developer_stats, key=lambda x: x["stats"]["activity_score"])
+        for field in totals:
+            totals[field] += stats[field]
 
-    totals = {
-        "total_commits": sum(d["stats"]["total_commits"] for d in developer_stats),
-        "total_files_changed": sum(d["stats"]["total_files_changed"] for d in developer_stats),
-        "total_additions": sum(d["stats"]["total_additions"] for d in developer_stats),
-        "total_deletions": sum(d["stats"]["total_deletions"] for d in developer_stats)
-    }
+        for ranking, field in ranked_fields.items():
+            current = best.get(ranking)
+            if current is None or stats[field] > current["value"]:
+                best[ranking] = {
+                    "developer": dev_stat["developer"],
+                    "value": stats[field]
+                }
 
     return {
-        "rankings": {
-            "most_commits": {
-                "developer": most_commits["developer"],
-                "value": most_commits["stats"]["total_commits"]
-            },
-            "most_files_changed": {
-                "developer": most_files["developer"],
-                "value": most_files["stats"]["total_files_changed"]
-            },
-            "most_additions": {
-                "developer": most_additions["developer"],
-                "value": most_additions["stats"]["total_additions"]
-            },
-            "most_deletions": {
-                "developer": most_deletions["developer"],
-                "value": most_deletions["stats"]["total_deletions"]
-            },
-            "most_active": {
-                "developer": most_active["developer"],
-                "value": most_active["stats"]["activity_score"]
-            }
-        },
+        "rankings": {ranking: best[ranking] for ranking in ranked_fields},
         "totals": totals
     }
 
@@ -76,24 +135,26 @@ async def build_comparison_json(
     until: Optional[str] = None
 ) -> Dict[str, Any]:
     """Build final JSON response for developer comparison."""
-    developer_stats = []
-
-    for author in authors:
-        raw = await get_commit_history_raw(
-            repo_path=repo_path,
-            author=author,
-            since=since,
-            until=until
-        )
-
-        commits = parse_commit_history(raw)
-        stats = analyze_developer_stats(commits)
-
-        developer_stats.append({
-            "developer": author,
-            "stats": stats
-        })
+    # One history walk for everyone, then split per requested author
+    raw = await get_commit_history_raw(
+        repo_path=repo_path,
+        authors=authors,
+        since=since,
+        until=until,
+        mailmap=True
+    )
+
+    def analyze() -> List[Dict[str, Any]]:
+        commits_by_author = bucket_commits_by_author(parse_commit_history(raw), authors)
+        return [
+            {
+                "developer": author,
+                "stats": analyze_developer_stats(commits_by_author[author])
+            }
+            for author in authors
+        ]
 
+    developer_stats = await asyncio.to_thread(analyze)
     comparison = compare_developers(developer_stats)
 
     return {
@@ -1,11 +1,13 @@
 import asyncio
+import heapq
 import os
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 from collections import Counter, defaultdict
+from operator import itemgetter
 
 from mcp.server.fastmcp import FastMCP
-from tools.git_commit_history import get_commit_history_raw, parse_commit_history
+from tools.git_commit_history import count_paths, iter_commits
 from git_runner import ensure_is_git_repo
 
 
@@ -23,16 +25,23 @@ STABILITY_THRESHOLD = 0.3
 async def collect_dashboard_data(
     repo_path: str,
     since: Optional[str] = None,
-    until: Optional[str] = None
+    until: Optional[str] = None,
+    authors: Optional[List[str]] = None,
+    paths: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """Collect all raw commit data for dashboard analysis."""
-    commits_raw = await get_commit_history_raw(
-        repo_path=repo_path,
-        since=since,
-        until=until
-    )
-
-    commits = parse_commit_history(commits_raw)
+    # Author and path filters are applied by git, so unrelated commits are
+    # never diffed or parsed. Commits are parsed (in a worker thread) while git
+    # is still writing, and a concurrent identical fetch shares the same git log
+    commits = [
+        commit async for commit in iter_commits(
+            repo_path=repo_path,
+            since=since,
+            until=until,
+            authors=authors,
+            paths=paths
+        )
+    ]
 
     return {
         "commits": commits,
@@ -42,7 +51,56 @@ async def collect_dashboard_data(
     }
 
 
-def analyze_executive_summary(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _aggregate(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Collect per-developer, per-file and overall line totals in one pass over commits."""
+    # Flat per-key maps instead of one small dict per developer/file
+    dev_commits = Counter(commit["author_name"] for commit in commits)
+    dev_additions: Dict[str, int] = defaultdict(int)
+    dev_deletions: Dict[str, int] = defaultdict(int)
+    dev_files: Dict[str, set] = defaultdict(set)
+    file_developers: Dict[str, set] = defaultdict(set)
+    file_additions: Dict[str, int] = defaultdict(int)
+    file_deletions: Dict[str, int] = defaultdict(int)
+    touched_paths = []
+    total_additions = 0
+    total_deletions = 0
+
+    for commit in commits:
+        developer = commit["author_name"]
+        # Per-commit line totals are already summed by the parser
+        commit_stats = commit["stats"]
+        dev_additions[developer] += commit_stats["total_additions"]
+        dev_deletions[developer] += commit_stats["total_deletions"]
+        total_additions += commit_stats["total_additions"]
+        total_deletions += commit_stats["total_deletions"]
+
+        files_of_dev = dev_files[developer]
+        for file_info in commit["files"]:
+            path = file_info["path"]
+            touched_paths.append(path)
+            files_of_dev.add(path)
+            file_developers[path].add(developer)
+            file_additions[path] += file_info["additions"]
+            file_deletions[path] += file_info["deletions"]
+
+    return {
+        "dev_commits": dev_commits,
+        "dev_additions": dev_additions,
+        "dev_deletions": dev_deletions,
+        "dev_files": dev_files,
+        "file_commits": count_paths(touched_paths),
+        "file_developers": file_developers,
+        "file_additions": file_additions,
+        "file_deletions": file_deletions,
+        "total_additions": total_additions,
+        "total_deletions": total_deletions
+    }
+
+
+def analyze_executive_summary(
+    commits: List[Dict[str, Any]],
+    aggregate: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """Calculate high-level statistics for executive summary."""
     if not commits:
         return {
@@ -55,17 +113,11 @@ def analyze_executive_summary(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
             "avg_commits_per_day": 0
         }
 
-    developers = {c["author_name"] for c in commits}
+    if aggregate is None:
+        aggregate = _aggregate(commits)
 
-    all_files = set()
-    total_additions = 0
-    total_deletions = 0
-
-    for commit in commits:
-        for file_info in commit.get("files", []):
-            all_files.add(file_info["path"])
-            total_additions += file_info.get("additions", 0)
-            total_deletions += file_info.get("deletions", 0)
+    total_additions = aggregate["total_additions"]
+    total_deletions = aggregate["total_deletions"]
 
     if commits:
         latest_date = commits[0]["date"]
@@ -84,8 +136,8 @@ def analyze_executive_summary(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
 
     return {
         "total_commits": len(commits),
-        "total_developers": len(developers),
-        "total_files_changed": len(all_files),
+        "total_developers": len(aggregate["dev_commits"]),
+        "total_files_changed": len(aggregate["file_commits"]),
         "total_additions": total_additions,
         "total_deletions": total_deletions,
         "net_lines": total_additions - total_deletions,
@@ -93,7 +145,10 @@ def analyze_executive_summary(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
-def analyze_team_performance(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_team_performance(
+    commits: List[Dict[str, Any]],
+    aggregate: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """Analyze developer contributions and identify top performers."""
     if not commits:
         return {
@@ -103,65 +158,65 @@ def analyze_team_performance(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
             "alerts": []
         }
 
-    dev_stats = defaultdict(lambda: {
-        "commits": 0,
-        "additions": 0,
-        "deletions": 0,
-        "files": set()
-    })
-
-    for commit in commits:
-        dev_name = commit["author_name"]
-        dev_stats[dev_name]["commits"] += 1
-
-        for file_info in commit.get("files", []):
-            dev_stats[dev_name]["additions"] += file_info.get("additions", 0)
-            dev_stats[dev_name]["deletions"] += file_info.get("deletions", 0)
-            dev_stats[dev_name]["files"].add(file_info["path"])
+    if aggregate is None:
+        aggregate = _aggregate(commits)
+    dev_commits = aggregate["dev_commits"]
+    dev_additions = aggregate["dev_additions"]
+    dev_deletions = aggregate["dev_deletions"]
+    dev_files = aggregate["dev_files"]
 
     total_commits = len(commits)
     contributors = []
 
-    for dev_name, stats in dev_stats.items():
-        activity_score = stats["additions"] + stats["deletions"]
-        percentage = round((stats["commits"] / total_commits) * 100, 1) if total_commits > 0 else 0
+    for dev_name, commit_count in dev_commits.items():
+        additions = dev_additions[dev_name]
+        deletions = dev_deletions[dev_name]
+        percentage = round((commit_count / total_commits) * 100, 1) if total_commits > 0 else 0
 
         contributors.append({
             "developer": dev_name,
-            "commits": stats["commits"],
+            "commits": commit_count,
             "percentage": percentage,
-            "additions": stats["additions"],
-            "deletions": stats["deletions"],
-            "files_touched": len(stats["files"]),
-            "activity_score": activity_score
+            "additions": additions,
+            "deletions": deletions,
+            "files_touched": len(dev_files[dev_name]),
+            "activity_score": additions + deletions
         })
 
-    contributors.sort(key=lambda x: x["commits"], reverse=True)
-    for i, contrib in enumerate(contributors, 1):
+    # Only the top 5 are returned; ties keep first-seen order as with a sort
+    top_contributors = heapq.nlargest(5, contributors, key=itemgetter("commits"))
+    for i, contrib in enumerate(top_contributors, 1):
         contrib["rank"] = i
 
-    top_contributors = contributors[:5]
-    active_developers = len(dev_stats)
+    active_developers = len(dev_commits)
+
+    low_activity = [
+        contrib for contrib in contributors
+        if contrib["percentage"] < LOW_ACTIVITY_PERCENTAGE and contrib["commits"] < LOW_ACTIVITY_COMMITS
+    ]
+    low_activity.sort(key=itemgetter("commits"), reverse=True)
 
     alerts = []
-    for contrib in contributors:
-        if contrib["percentage"] < LOW_ACTIVITY_PERCENTAGE and contrib["commits"] < LOW_ACTIVITY_COMMITS:
-            alerts.append({
-                "type": "low_activity",
-                "developer": contrib["developer"],
-                "message": f"Only {contrib['commits']} commits - low activity",
-                "severity": "warning"
-            })
+    for contrib in low_activity:
+        alerts.append({
+            "type": "low_activity",
+            "developer": contrib["developer"],
+            "message": f"Only {contrib['commits']} commits - low activity",
+            "severity": "warning"
+        })
 
     return {
         "top_contributors": top_contributors,
-        "developer_count": len(dev_stats),
+        "developer_count": len(dev_commits),
         "active_developers": active_developers,
         "alerts": alerts
     }
 
 
-def analyze_code_health(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_code_health(
+    commits: List[Dict[str, Any]],
+    aggregate: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """Analyze code health: hotspots, high churn files, file type distribution."""
     if not commits:
         return {
@@ -170,79 +225,67 @@ def analyze_code_health(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
             "file_types_distribution": {}
         }
 
-    file_stats = defaultdict(lambda: {
-        "commits": 0,
-        "developers": set(),
-        "additions": 0,
-        "deletions": 0
-    })
-
-    for commit in commits:
-        developer = commit["author_name"]
-
-        for file_info in commit.get("files", []):
-            path = file_info["path"]
-            file_stats[path]["commits"] += 1
-            file_stats[path]["developers"].add(developer)
-            file_stats[path]["additions"] += file_info.get("additions", 0)
-            file_stats[path]["deletions"] += file_info.get("deletions", 0)
-
-    hotspots = []
-    for path, stats in file_stats.items():
-        churn = stats["additions"] + stats["deletions"]
-        developer_count = len(stats["developers"])
-
-        if stats["commits"] > RISK_HIGH_COMMITS or developer_count > RISK_HIGH_DEVELOPERS:
+    if aggregate is None:
+        aggregate = _aggregate(commits)
+    file_commits = aggregate["file_commits"]
+    file_developers = aggregate["file_developers"]
+    file_additions = aggregate["file_additions"]
+    file_deletions = aggregate["file_deletions"]
+
+    # Bounded heaps pick the top files; only those get a result dict
+    top_hotspots = []
+    for rank, (path, commit_count) in enumerate(file_commits.most_common(10), 1):
+        additions = file_additions[path]
+        deletions = file_deletions[path]
+        developer_count = len(file_developers[path])
+
+        if commit_count > RISK_HIGH_COMMITS or developer_count > RISK_HIGH_DEVELOPERS:
             risk_level = "high"
-        elif stats["commits"] > RISK_MEDIUM_COMMITS or developer_count > RISK_MEDIUM_DEVELOPERS:
+        elif commit_count > RISK_MEDIUM_COMMITS or developer_count > RISK_MEDIUM_DEVELOPERS:
             risk_level = "medium"
         else:
             risk_level = "low"
 
-        hotspots.append({
+        top_hotspots.append({
             "path": path,
-            "commits": stats["commits"],
+            "commits": commit_count,
             "developers": developer_count,
-            "additions": stats["additions"],
-            "deletions": stats["deletions"],
-            "churn": churn,
-            "risk_level": risk_level
+            "additions": additions,
+            "deletions": deletions,
+            "churn": additions + deletions,
+            "risk_level": risk_level,
+            "rank": rank
         })
 
-    hotspots.sort(key=lambda x: x["commits"], reverse=True)
-    for i, hotspot in enumerate(hotspots[:10], 1):
-        hotspot["rank"] = i
-
-    top_hotspots = hotspots[:10]
-
-    high_churn = []
-    for path, stats in file_stats.items():
-        churn = stats["additions"] + stats["deletions"]
-        net_change = abs(stats["additions"] - stats["deletions"])
-
-        if churn > HIGH_CHURN_THRESHOLD:
-            stability_ratio = net_change / churn if churn > 0 else 0
-            stability = "stable" if stability_ratio > STABILITY_THRESHOLD else "unstable"
+    churn_by_path = (
+        (path, file_additions[path] + file_deletions[path]) for path in file_commits
+    )
+    high_churn = heapq.nlargest(
+        5,
+        ((path, churn) for path, churn in churn_by_path if churn > HIGH_CHURN_THRESHOLD),
+        key=itemgetter(1)
+    )
 
-            high_churn.append({
-                "path": path,
-                "additions": stats["additions"],
-                "deletions": stats["deletions"],
-                "churn": churn,
-                "net_change": stats["additions"] - stats["deletions"],
-                "stability": stability
-            })
+    high_churn_files = []
+    for path, churn in high_churn:
+        additions = file_additions[path]
+        deletions = file_deletions[path]
+        stability_ratio = abs(additions - deletions) / churn
+        stability = "stable" if stability_ratio > STABILITY_THRESHOLD else "unstable"
 
-    high_churn.sort(key=lambda x: x["churn"], reverse=True)
-    high_churn_files = high_churn[:5]
+        high_churn_files.append({
+            "path": path,
+            "additions": additions,
+            "deletions": deletions,
+            "churn": churn,
+            "net_change": additions - deletions,
+            "stability": stability
+        })
 
     file_types = Counter()
-    for path in file_stats.keys():
-        if '.' in path:
-            ext = '.' + path.rsplit('.', 1)[1]
-            file_types[ext] += 1
-        else:
-            file_types["(no extension)"] += 1
+    for path in file_commits:
+        ext = os.path.splitext(path)[1]
+        file_types[ext or "(no extension)"] += 1
 
     total_files = sum(file_types.values())
     file_types_distribution = {}
@@ -264,15 +307,22 @@ def analyze_code_health(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
 async def build_dashboard_json(
     repo_path: str,
     since: str = "30 days ago",
-    until: Optional[str] = None
+    until: Optional[str] = None,
+    authors: Optional[List[str]] = None,
+    paths: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """Build complete dashboard JSON with all analyses."""
-    raw_data = await collect_dashboard_data(repo_path, since, until)
+    raw_data = await collect_dashboard_data(repo_path, since, until, authors, paths)
     commits = raw_data["commits"]
 
-    executive_summary = analyze_executive_summary(commits)
-    team_performance = analyze_team_performance(commits)
-    code_health = analyze_code_health(commits)
+    # Walk the parsed commits once; the analyzers only format the result.
+    # All of it is CPU-bound, so it runs in worker threads off the event loop
+    aggregate = await asyncio.to_thread(_aggregate, commits)
+    executive_summary, team_performance, code_health = await asyncio.gather(
+        asyncio.to_thread(analyze_executive_summary, commits, aggregate),
+        asyncio.to_thread(analyze_team_performance, commits, aggregate),
+        asyncio.to_thread(analyze_code_health, commits, aggregate)
+    )
 
     repo_name = os.path.basename(repo_path)
 
@@ -286,6 +336,10 @@ async def build_dashboard_json(
             "until": until or "now",
             "total_commits_analyzed": len(commits)
         },
+        "filters": {
+            "authors": authors,
+            "paths": paths
+        },
         "executive_summary": executive_summary,
         "team_performance": team_performance,
         "code_health": code_health,
@@ -321,7 +375,9 @@ def register(mcp: FastMCP) -> None:
     async def get_project_dashboard(
         repo_path: str,
         since: str = "30 days ago",
-        until: Optional[str] = None
+        until: Optional[str] = None,
+        authors: Optional[List[str]] = None,
+        paths: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Generate comprehensive project dashboard with analytics and insights.
@@ -330,6 +386,8 @@ def register(mcp: FastMCP) -> None:
             repo_path: Absolute path to git repository
             since: Analyze commits since this date (default: "30 days ago")
             until: Analyze commits until this date (default: now)
+            authors: Only include commits by these developers (names or emails, optional)
+            paths: Only include changes under these paths, e.g. ["src/api"] (optional)
 
         Returns complete dashboard with executive summary (commits, developers, lines changed),
         team performance (top contributors, activity alerts), code health (hotspots, churn files,
@@ -340,5 +398,7 @@ def register(mcp: FastMCP) -> None:
         return await build_dashboard_json(
             repo_path=repo_path,
             since=since,
-            until=until
+            until=until,
+            authors=authors,
+            paths=paths
         )
@@ -1,8 +1,17 @@
+import asyncio
+import heapq
+import os
 from typing import Any, Dict, List, Optional
-from collections import Counter
+from collections import Counter, defaultdict
+from operator import itemgetter
 
 from mcp.server.fastmcp import FastMCP
-from tools.git_commit_history import get_commit_history_raw, parse_commit_history
+from tools.git_commit_history import (
+    count_paths,
+    format_authors,
+    get_commit_history_raw,
+    parse_commit_history
+)
 from git_runner import ensure_is_git_repo
 
 
@@ -19,52 +28,49 @@ def analyze_developer_stats(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
         }
 
     total_commits = len(commits)
-    total_files_changed = sum(c["stats"]["total_files"] for c in commits)
-    total_additions = sum(c["stats"]["total_additions"] for c in commits)
-    total_deletions = sum(c["stats"]["total_deletions"] for c in commits)
+    total_files_changed = 0
+    total_additions = 0
+    total_deletions = 0
 
-    file_stats: Dict[str, Dict[str, int]] = {}
+    touched_paths = []
+    file_additions: Dict[str, int] = defaultdict(int)
+    file_deletions: Dict[str, int] = defaultdict(int)
 
     for commit in commits:
+        commit_stats = commit["stats"]
+        total_files_changed += commit_stats["total_files"]
+        total_additions += commit_stats["total_additions"]
+        total_deletions += commit_stats["total_deletions"]
+
         for file in commit["files"]:
             path = file["path"]
+            touched_paths.append(path)
+            file_additions[path] += file["additions"]
+            file_deletions[path] += file["deletions"]
 
-            if path not in file_stats:
-                file_stats[path] = {
-                    "commits": 0,
-                    "additions": 0,
-                    "deletions": 0
-                }
-
-            file_stats[path]["commits"] += 1
-            file_stats[path]["additions"] += file["additions"]
-            file_stats[path]["deletions"] += file["deletions"]
+    file_commits = count_paths(touched_paths)
 
+    # Only the top 20 are returned; a bounded heap avoids sorting every path
     most_active_files = [
         {
             "path": path,
-            "commits": stats["commits"],
-            "additions": stats["additions"],
-            "deletions": stats["deletions"]
+            "commits": commits_count,
+            "additions": file_additions[path],
+            "deletions": file_deletions[path]
         }
-        for path, stats in file_stats.items()
+        for path, commits_count in heapq.nlargest(20, file_commits.items(), key=itemgetter(1))
     ]
-    most_active_files.sort(key=lambda x: x["commits"], reverse=True)
 
-    file_type_counter = Counter()
-    for path in file_stats.keys():
-        if "." in path:
-            ext = "." + path.split(".")[-1]
-            file_type_counter[ext] += 1
-        else:
-            file_type_counter["(no extension)"] += 1
+    file_type_counter = Counter(
+        os.path.splitext(path)[1] or "(no extension)" for path in file_commits
+    )
 
     return {
         "total_commits": total_commits,
         "total_files_changed": total_files_changed,
         "total_additions": total_additions,
         "total_deletions": total_deletions,
-        "most_active_files": most_active_files[:20],
+        "most_active_files": most_active_files,
         "file_types": dict(file_type_counter.most_common(10))
     }
 
@@ -80,7 +86,7 @@ def build_developer_stats_json(
     commits = parse_commit_history(commits_raw)
     stats = analyze_developer_stats(commits)
 
-    matched_authors = {f"{c['author_name']} <{c['author_email']}>" for c in commits}
+    matched_authors = format_authors((c["author_name"], c["author_email"]) for c in commits)
 
     actual_range = {
         "first_commit": None,
@@ -95,7 +101,7 @@ def build_developer_stats_json(
         "repo": {"path": repo_path},
         "developer": {
             "identifier": author,
-            "matched_as": sorted(list(matched_authors))
+            "matched_as": matched_authors
         },
         "time_range": {
             "since": since,
@@ -136,7 +142,9 @@ def register(mcp: FastMCP) -> None:
             until=until
         )
 
-        return build_developer_stats_json(
+        # CPU-bound parsing runs in a worker thread to keep the event loop responsive
+        return await asyncio.to_thread(
+            build_developer_stats_json,
             repo_path=repo_path,
             author=author,
             commits_raw=raw,
@@ -1,18 +1,27 @@
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from mcp.server.fastmcp import FastMCP
-from git_runner import run_git, ensure_is_git_repo
-
-
-async def get_file_history_raw(
-    repo_path: str,
+from git_runner import ensure_is_git_repo
+from tools.git_commit_history import commit_record_key, format_authors
+from git_cache import (
+    CACHE_MAX_BYTES,
+    LogRecorder,
+    cached_run_git,
+    lookup_output,
+    store_output,
+    stream_shared
+)
+
+
+def _file_history_args(
     file_path: str,
     since: Optional[str] = None,
     until: Optional[str] = None,
     max_count: Optional[int] = None
-) -> str:
-    """Execute git log for a specific file and return raw output."""
+) -> List[str]:
+    """Build git log arguments for the history of a single file."""
     args = [
         "log",
         "--follow",
@@ -32,99 +41,196 @@ async def get_file_history_raw(
     args.append("--")
     args.append(file_path)
 
-    return await run_git(repo_path, args)
+    return args
 
 
-def parse_file_history(raw: str, target_file: str) -> List[Dict[str, Any]]:
-    """Parse git log output for a specific file."""
-    commits: List[Dict[str, Any]] = []
+async def get_file_history_raw(
+    repo_path: str,
+    file_path: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    max_count: Optional[int] = None
+) -> str:
+    """Execute git log for a specific file and return raw output."""
+    return await cached_run_git(repo_path, _file_history_args(file_path, since, until, max_count))
 
-    if not raw:
-        return commits
 
-    lines = raw.splitlines()
-    current_commit: Optional[Dict[str, Any]] = None
+def _start_file_commit(line: str) -> Optional[Dict[str, Any]]:
+    """Create a commit dict from a COMMIT| header line (None if malformed)."""
+    parts = line[7:].split("|", 4)
 
-    for line in lines:
-        line_stripped = line.strip()
+    if len(parts) != 5:
+        return None
+
+    # %H and %ai are fixed-format; only the free-text fields need trimming
+    return {
+        "hash": parts[0],
+        "author_name": parts[1].strip(),
+        "author_email": parts[2].strip(),
+        "date": parts[3],
+        "message": parts[4].strip(),
+        "changes": {
+            "additions": 0,
+            "deletions": 0,
+            "file_path": None
+        }
+    }
 
-        if line_stripped.startswith("COMMIT|"):
+
+def _empty_summary() -> Dict[str, Any]:
+    """Create the summary of a file history with no commits."""
+    return {
+        "total_commits": 0,
+        "total_additions": 0,
+        "total_deletions": 0,
+        "unique_authors": [],
+        "first_change": None,
+        "last_change": None
+    }
+
+
+def _finish_commit(
+    commits: List[Dict[str, Any]],
+    summary: Dict[str, Any],
+    authors_set: Set[Tuple[str, str]],
+    commit: Dict[str, Any]
+) -> None:
+    """Append a fully parsed commit and add it to the running summary."""
+    commits.append(commit)
+    summary["total_additions"] += commit["changes"]["additions"]
+    summary["total_deletions"] += commit["changes"]["deletions"]
+    authors_set.add((commit["author_name"], commit["author_email"]))
+
+
+def _close_summary(
+    commits: List[Dict[str, Any]],
+    summary: Dict[str, Any],
+    authors_set: Set[Tuple[str, str]]
+) -> None:
+    """Fill the summary fields that depend on the complete commit list."""
+    if commits:
+        summary["total_commits"] = len(commits)
+        summary["unique_authors"] = format_authors(authors_set)
+        summary["last_change"] = commits[0]["date"]
+        summary["first_change"] = commits[-1]["date"]
+
+
+def _parse_file_history_lines(
+    lines: Iterable[str],
+    current_commit: Optional[Dict[str, Any]],
+    finish: Callable[[Dict[str, Any]], None]
+) -> Optional[Dict[str, Any]]:
+    """
+    Parse a run of file history lines, calling finish() on every commit a later header closes.
+
+    Returns the commit still open after the last line; pass it back in with
+    the next run of lines, or finish it once the log has ended.
+    """
+    # Kept bound so numstat rows write to it without re-looking it up
+    changes = current_commit["changes"] if current_commit is not None else None
+
+    # git log lines carry no padding, so they are used without strip()
+    for line in lines:
+        if line.startswith("COMMIT|"):
             if current_commit is not None:
-                commits.append(current_commit)
-
-            parts = line_stripped.split("|", 5)
-
-            if len(parts) != 6:
-                current_commit = None
-                continue
-
-            current_commit = {
-                "hash": parts[1].strip(),
-                "author_name": parts[2].strip(),
-                "author_email": parts[3].strip(),
-                "date": parts[4].strip(),
-                "message": parts[5].strip(),
-                "changes": {
-                    "additions": 0,
-                    "deletions": 0,
-                    "file_path": None
-                }
-            }
-
-        elif current_commit is not None and line_stripped:
-            parts = line_stripped.split("\t")
+                finish(current_commit)
+            current_commit = _start_file_commit(line)
+            changes = current_commit["changes"] if current_commit is not None else None
+
+        elif changes is not None and line:
+            parts = line.split("\t", 2)
 
             if len(parts) == 3:
-                additions_str = parts[0].strip()
-                deletions_str = parts[1].strip()
-                filepath = parts[2].strip()
+                # numstat fields are tab-delimited with no padding; "-" marks binary
+                additions_str, deletions_str, filepath = parts
+                changes["additions"] = 0 if additions_str == "-" else int(additions_str)
+                changes["deletions"] = 0 if deletions_str == "-" else int(deletions_str)
+                changes["file_path"] = filepath
 
-                additions = 0 if additions_str == "-" else int(additions_str)
-                deletions = 0 if deletions_str == "-" else int(deletions_str)
+    return current_commit
 
-                current_commit["changes"]["additions"] = additions
-                current_commit["changes"]["deletions"] = deletions
-                current_commit["changes"]["file_path"] = filepath
 
-    if current_commit is not None:
-        commits.append(current_commit)
+def _parse_file_history(raw: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Parse git log output for a file into (commits, summary) in one pass."""
+    commits: List[Dict[str, Any]] = []
+    summary = _empty_summary()
+    authors_set: Set[Tuple[str, str]] = set()
 
-    return commits
+    if not raw:
+        return commits, summary
 
+    def finish(commit: Dict[str, Any]) -> None:
+        _finish_commit(commits, summary, authors_set, commit)
 
-async def build_file_history_json(
+    last_commit = _parse_file_history_lines(raw.splitlines(), None, finish)
+    if last_commit is not None:
+        finish(last_commit)
+
+    _close_summary(commits, summary, authors_set)
+    return commits, summary
+
+
+def parse_file_history(raw: str, target_file: str) -> List[Dict[str, Any]]:
+    """Parse git log output for a specific file."""
+    return _parse_file_history(raw)[0]
+
+
+async def iter_file_history(
     repo_path: str,
     file_path: str,
-    file_history_raw: str,
     since: Optional[str] = None,
     until: Optional[str] = None,
     max_count: Optional[int] = None
-) -> Dict[str, Any]:
-    """Build final JSON response for file history."""
-    commits = parse_file_history(file_history_raw, file_path)
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream git log for a file and yield parsed commits as each one completes.
+
+    Same result as parse_file_history(await get_file_history_raw(...)),
+    without holding the whole log first. Served from the output cache when
+    possible; a fully read stream is stored for later calls.
+    """
+    args = _file_history_args(file_path, since, until, max_count)
+
+    raw, refs_state = await lookup_output(repo_path, args)
+    if raw is not None:
+        # A cached log arrives all at once: parse it off the event loop
+        for commit in await asyncio.to_thread(parse_file_history, raw, file_path):
+            yield commit
+        return
 
-    full_path = os.path.join(repo_path, file_path)
-    file_exists = os.path.exists(full_path)
+    current_commit: Optional[Dict[str, Any]] = None
 
-    summary: Dict[str, Any] = {
-        "total_commits": len(commits),
-        "total_additions": 0,
-        "total_deletions": 0,
-        "unique_authors": [],
-        "first_change": None,
-        "last_change": None
-    }
+    def parse_batch(lines: List[str]) -> List[Dict[str, Any]]:
+        nonlocal current_commit
+        completed: List[Dict[str, Any]] = []
+        current_commit = _parse_file_history_lines(lines, current_commit, completed.append)
+        return completed
 
-    if commits:
-        summary["total_additions"] = sum(c["changes"]["additions"] for c in commits)
-        summary["total_deletions"] = sum(c["changes"]["deletions"] for c in commits)
+    # Tee the stream so later calls can reuse it; a log too large to cache is not copied
+    recorder = LogRecorder(commit_record_key, CACHE_MAX_BYTES) if refs_state is not None else None
 
-        authors_set = {f"{c['author_name']} <{c['author_email']}>" for c in commits}
-        summary["unique_authors"] = sorted(list(authors_set))
+    def store(records: Dict[str, str]) -> None:
+        store_output(repo_path, refs_state, args, "\n".join(records.values()))
+
+    async for completed in stream_shared(repo_path, args, parse_batch, recorder, store):
+        for commit in completed:
+            yield commit
+
+    if current_commit is not None:
+        yield current_commit
 
-        summary["last_change"] = commits[0]["date"]
-        summary["first_change"] = commits[-1]["date"]
 
+def _file_history_json(
+    repo_path: str,
+    file_path: str,
+    file_exists: bool,
+    commits: List[Dict[str, Any]],
+    summary: Dict[str, Any],
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    max_count: Optional[int] = None
+) -> Dict[str, Any]:
+    """Build the file history response from parsed commits and their summary."""
     return {
         "repo": {"path": repo_path},
         "file": {
@@ -141,6 +247,24 @@ async def build_file_history_json(
     }
 
 
+async def build_file_history_json(
+    repo_path: str,
+    file_path: str,
+    file_history_raw: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    max_count: Optional[int] = None
+) -> Dict[str, Any]:
+    """Build final JSON response for file history."""
+    # The summary is accumulated while parsing, not in a second pass
+    (commits, summary), file_exists = await asyncio.gather(
+        asyncio.to_thread(_parse_file_history, file_history_raw),
+        asyncio.to_thread(os.path.exists, os.path.join(repo_path, file_path))
+    )
+
+    return _file_history_json(repo_path, file_path, file_exists, commits, summary, since, until, max_count)
+
+
 def register(mcp: FastMCP) -> None:
     """Register file change tracking tools with MCP server."""
     @mcp.tool()
@@ -166,19 +290,20 @@ def register(mcp: FastMCP) -> None:
         """
         await ensure_is_git_repo(repo_path)
 
-        raw = await get_file_history_raw(
-            repo_path=repo_path,
-            file_path=file_path,
-            since=since,
-            until=until,
-            max_count=max_count
+        # stat() the file in a worker thread while git log is running
+        exists_task = asyncio.create_task(
+            asyncio.to_thread(os.path.exists, os.path.join(repo_path, file_path))
         )
 
-        return await build_file_history_json(
-            repo_path=repo_path,
-            file_path=file_path,
-            file_history_raw=raw,
-            since=since,
-            until=until,
-            max_count=max_count
+        commits: List[Dict[str, Any]] = []
+        summary = _empty_summary()
+        authors_set: Set[Tuple[str, str]] = set()
+
+        # Commits are parsed and summarized while git is still writing the log
+        async for commit in iter_file_history(repo_path, file_path, since, until, max_count):
+            _finish_commit(commits, summary, authors_set, commit)
+        _close_summary(commits, summary, authors_set)
+
+        return _file_history_json(
+            repo_path, file_path, await exists_task, commits, summary, since, until, max_count
         )
@@ -1,35 +1,73 @@
+import re
+import sys
 from typing import Any, Dict, Optional
 from datetime import datetime
 
 from mcp.server.fastmcp import FastMCP
 from git_runner import run_git, ensure_is_git_repo
+import git_cache
+
+
+# "Fetching origin", or a ref update such as
+# "* [new branch]  feature -> origin/feature" / "abc..def  main -> origin/main"
+_FETCH_LINE_RE = re.compile(
+    r"Fetching\s+(?P<fetched>\S+)"
+    r"|[ +\-tx*!=]?\s*(?P<summary>\[[^\]]+\]|\S+)\s+\S+\s+->\s+(?P<remote>[^/\s]+)/(?P<branch>\S+)"
+)
+
+# "## main...origin/main [ahead 2, behind 3]" - tracking and bracket are optional.
+# With tracking, the branch part may contain spaces ("No commits yet on main");
+# without it, only the first token is the branch ("HEAD (no branch)")
+_BRANCH_LINE_RE = re.compile(
+    r"##\s+(?:(?P<branch>[^\n]+?)\.\.\.(?P<tracking>\S+)|(?P<local>\S+))"
+    r"(?:\s+\[(?P<state>[^\]\n]+)\])?"
+)
+_AHEAD_RE = re.compile(r"ahead (\d+)")
+_BEHIND_RE = re.compile(r"behind (\d+)")
+
+# (is ahead, is behind) -> sync_status
+_SYNC_STATUSES = {
+    (False, False): "up-to-date",
+    (True, False): "ahead",
+    (False, True): "behind",
+    (True, True): "diverged"
+}
 
 
 async def sync_repository_fetch(repo_path: str) -> str:
     """Run git fetch to sync with all remotes."""
     args = ["fetch", "--all", "--prune", "--verbose"]
-    return await run_git(repo_path, args)
+    try:
+        return await run_git(repo_path, args)
+    finally:
+        git_cache.invalidate(repo_path)
 
 
 async def sync_repository_pull(repo_path: str, branch: Optional[str] = None) -> str:
     """Run git pull to sync and update the current branch."""
     output_parts = []
 
-    if branch:
-        checkout_args = ["checkout", branch]
-        checkout_output = await run_git(repo_path, checkout_args)
-        output_parts.append(f"CHECKOUT:\n{checkout_output}")
+    try:
+        if branch:
+            checkout_args = ["checkout", branch]
+            checkout_output = await run_git(repo_path, checkout_args)
+            output_parts.append(f"CHECKOUT:\n{checkout_output}")
 
-    pull_args = ["pull", "--verbose"]
-    pull_output = await run_git(repo_path, pull_args)
-    output_parts.append(f"PULL:\n{pull_output}")
+        pull_args = ["pull", "--verbose"]
+        pull_output = await run_git(repo_path, pull_args)
+        output_parts.append(f"PULL:\n{pull_output}")
+    finally:
+        # Refs may have moved even if a step failed midway
+        git_cache.invalidate(repo_path)
 
     return "\n\n".join(output_parts)
 
 
 async def get_sync_status(repo_path: str) -> str:
     """Get current sync status by checking commits ahead/behind remote."""
-    args = ["status", "--branch", "--short"]
+    # Only the "## branch...tracking" header is used; skipping the untracked
+    # file scan is most of the cost of status on a large working tree
+    args = ["status", "--branch", "--short", "--untracked-files=no"]
     return await run_git(repo_path, args)
 
 
@@ -48,51 +86,24 @@ def parse_fetch_output(raw: str) -> Dict[str, Any]:
     branches_pruned = []
 
     for line in raw.splitlines():
-        line_stripped = line.strip()
-
-        if not line_stripped:
+        match = _FETCH_LINE_RE.match(line.strip())
+        if not match:
             continue
 
-        if "Fetching" in line_stripped:
-            parts = line_stripped.split()
-            if len(parts) >= 2:
-                remotes_set.add(parts[1])
-
-        if "->" in line_stripped:
-            if "[new branch]" in line_stripped:
-                parts = line_stripped.split("->")
-                if len(parts) == 2:
-                    branch_info = parts[1].strip()
-                    if "/" in branch_info:
-                        remote, branch = branch_info.split("/", 1)
-                        branches_updated.append({
-                            "remote": remote,
-                            "branch": branch,
-                            "action": "new"
-                        })
-
-            elif "[deleted]" in line_stripped or "x " in line_stripped:
-                parts = line_stripped.split("->")
-                if len(parts) == 2:
-                    branch_info = parts[1].strip()
-                    if "/" in branch_info:
-                        remote, branch = branch_info.split("/", 1)
-                        branches_pruned.append(branch)
-
-            else:
-                parts = line_stripped.split("->")
-                if len(parts) == 2:
-                    branch_info = parts[1].strip()
-                    if "/" in branch_info:
-                        remote, branch = branch_info.split("/", 1)
-                        branches_updated.append({
-                            "remote": remote,
-                            "branch": branch,
-                            "action": "updated"
-                        })
+        if match["fetched"]:
+            remotes_set.add(match["fetched"])
+        elif match["summary"] == "[deleted]":
+            branches_pruned.append(match["branch"])
+        else:
+            # Every entry repeats the same few remote names; share one object each
+            branches_updated.append({
+                "remote": sys.intern(match["remote"]),
+                "branch": sys.intern(match["branch"]),
+                "action": "new" if match["summary"] == "[new branch]" else "updated"
+            })
 
     return {
-        "remotes_synced": sorted(list(remotes_set)),
+        "remotes_synced": sorted(remotes_set),
         "branches_updated": branches_updated,
         "branches_pruned": branches_pruned,
         "raw_output": raw
@@ -101,18 +112,10 @@ def parse_fetch_output(raw: str) -> Dict[str, Any]:
 
 def parse_status_output(raw: str) -> Dict[str, Any]:
     """Parse git status --branch output."""
-    if not raw:
-        return {
-            "current_branch": None,
-            "tracking": None,
-            "ahead": 0,
-            "behind": 0,
-            "sync_status": "unknown"
-        }
-
-    lines = raw.splitlines()
+    # Only the first line carries branch info; the regex does all splitting
+    match = _BRANCH_LINE_RE.match(raw.lstrip()) if raw else None
 
-    if not lines:
+    if not match:
         return {
             "current_branch": None,
             "tracking": None,
@@ -121,60 +124,20 @@ def parse_status_output(raw: str) -> Dict[str, Any]:
             "sync_status": "unknown"
         }
 
-    branch_line = lines[0].strip()
-
-    if not branch_line.startswith("##"):
-        return {
-            "current_branch": None,
-            "tracking": None,
-            "ahead": 0,
-            "behind": 0,
-            "sync_status": "unknown"
-        }
-
-    branch_info = branch_line[3:].strip()
-
-    current_branch = None
-    tracking = None
-    ahead = 0
-    behind = 0
-
-    if "..." in branch_info:
-        parts = branch_info.split("...")
-        current_branch = parts[0].strip()
-
-        rest = parts[1].strip()
-
-        if "[" in rest:
-            tracking = rest.split("[")[0].strip()
-            status_part = rest.split("[")[1].split("]")[0]
-
-            if "ahead" in status_part:
-                ahead_str = status_part.split("ahead")[1].strip().split(",")[0].strip()
-                ahead = int(ahead_str) if ahead_str.isdigit() else 0
-
-            if "behind" in status_part:
-                behind_str = status_part.split("behind")[1].strip().split(",")[0].strip()
-                behind = int(behind_str) if behind_str.isdigit() else 0
-        else:
-            tracking = rest
-    else:
-        current_branch = branch_info.split()[0] if branch_info else None
-
-    sync_status = "up-to-date"
-    if ahead > 0 and behind > 0:
-        sync_status = "diverged"
-    elif ahead > 0:
-        sync_status = "ahead"
-    elif behind > 0:
-        sync_status = "behind"
+    ahead = behind = 0
+    state = match["state"]
+    if state:
+        ahead_match = _AHEAD_RE.search(state)
+        behind_match = _BEHIND_RE.search(state)
+        ahead = int(ahead_match.group(1)) if ahead_match else 0
+        behind = int(behind_match.group(1)) if behind_match else 0
 
     return {
-        "current_branch": current_branch,
-        "tracking": tracking,
+        "current_branch": match["branch"] or match["local"],
+        "tracking": match["tracking"],
         "ahead": ahead,
         "behind": behind,
-        "sync_status": sync_status
+        "sync_status": _SYNC_STATUSES[(ahead > 0, behind > 0)]
     }
 
 
@@ -185,7 +148,21 @@ async def build_sync_json(
     status_output: str
 ) -> Dict[str, Any]:
     """Build final JSON response for sync operation."""
-    sync_result = parse_fetch_output(raw_output)
+    up_to_date = operation == "pull" and (
+        "Already up to date" in raw_output or "Already up-to-date" in raw_output
+    )
+
+    if up_to_date:
+        # Nothing was merged and pull's fetch report goes to stderr, so the
+        # fetch parser could only find empty lists here
+        sync_result = {
+            "remotes_synced": [],
+            "branches_updated": [],
+            "branches_pruned": [],
+            "raw_output": raw_output
+        }
+    else:
+        sync_result = parse_fetch_output(raw_output)
     status_after = parse_status_output(status_output)
 
     success = True
@@ -201,7 +178,7 @@ async def build_sync_json(
             message += f", {branches_pruned_count} branch(es) pruned"
     else:
         message = f"Successfully pulled latest changes"
-        if "Already up to date" in raw_output or "Already up-to-date" in raw_output:
+        if up_to_date:
             message = "Already up to date with remote"
 
     return {